@@ -0,0 +1,31 @@
+"""
+Numba compatibility shim
+
+Kernels are decorated with ``njit`` from here so the bot still runs
+(just slower) on machines where numba is not installed. With numba,
+kernels are cached to disk by default so only the first run pays the
+compile cost.
+"""
+
+try:
+    from numba import njit as _numba_njit, prange
+    HAVE_NUMBA = True
+
+    def njit(*args, **kwargs):
+        """numba.njit with on-disk caching on unless cache=False is passed"""
+        kwargs.setdefault('cache', True)
+        return _numba_njit(*args, **kwargs)
+
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and called forms)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -1,5 +1,59 @@
 import pandas as pd
 import numpy as np
+from _njit import njit
+
+EXIT_STOP_LOSS = 0
+EXIT_TAKE_PROFIT = 1
+EXIT_TIMEOUT = 2
+EXIT_REASONS = ('stop_loss', 'take_profit', 'timeout')
+
+MAX_CANDLES_TO_HOLD = 20
+
+# Trade log columns, in export order
+TRADE_FIELDS = ('entry_time', 'exit_time', 'direction', 'entry_price', 'exit_price',
+                'stop_loss', 'take_profit', 'position_size', 'pnl_dollars', 'pnl_pct',
+                'exit_reason', 'capital_after')
+# Stored per trade next to the log but never exported (-1 when unknown)
+_INTERNAL_FIELDS = ('exit_idx',)
+_FLOAT_FIELDS = ('entry_price', 'exit_price', 'stop_loss', 'take_profit', 'position_size',
+                 'pnl_dollars', 'pnl_pct', 'capital_after')
+_OBJECT_FIELDS = ('entry_time', 'exit_time', 'direction', 'exit_reason')
+
+
+@njit(cache=True)
+def _scan_exit(highs, lows, entry_idx, max_hold, stop_loss, take_profit, is_long):
+    """
+    Walk forward from entry until stop loss or take profit is touched
+    
+    highs/lows are float32 and the SL/TP thresholds are compared in float32
+    too; the caller prices the exit in float64.
+    
+    Returns:
+        (exit_idx, exit_reason_code)
+    """
+    n = len(highs)
+    end = min(entry_idx + max_hold, n)
+    
+    for i in range(entry_idx + 1, end):
+        if is_long:
+            if lows[i] <= stop_loss:
+                return i, EXIT_STOP_LOSS
+            if highs[i] >= take_profit:
+                return i, EXIT_TAKE_PROFIT
+        else:
+            if highs[i] >= stop_loss:
+                return i, EXIT_STOP_LOSS
+            if lows[i] <= take_profit:
+                return i, EXIT_TAKE_PROFIT
+    
+    return min(entry_idx + max_hold, n - 1), EXIT_TIMEOUT
+
+
+def warm_up():
+    """Compile (or load from cache) the exit-scan kernel ahead of the first trade"""
+    prices = np.ones(3, dtype=np.float32)
+    _scan_exit(prices, prices, 0, MAX_CANDLES_TO_HOLD, np.float32(0.5), np.float32(1.5), True)
+
 
 class BacktestEngine:
     """Simulate trading on historical data"""
@@ -11,10 +65,125 @@ class BacktestEngine:
             risk_per_trade_pct: Risk per trade as % of capital (1.0 = 1%)
         """
         self.initial_capital = initial_capital
-        self.capital = initial_capital
         self.risk_per_trade_pct = risk_per_trade_pct
-        self.trades = []
+        self._price_df = None
+        self._price_arrays = None
+        
+        # Trades are stored column-wise: numeric arrays plus object lists
+        self._cap = 4096
+        self._num = {name: np.empty(self._cap, dtype=np.float64) for name in _FLOAT_FIELDS}
+        self._num['exit_idx'] = np.empty(self._cap, dtype=np.int64)
+        
+        self.reset()
+    
+    def reset(self):
+        """
+        Start a new run: restore the starting capital and empty the trade log
+        
+        The numeric trade arrays and the cached price arrays are kept, so one
+        engine can be reused for many backtests on the same data.
+        """
+        self.capital = self.initial_capital
+        self.n_trades = 0
+        self._obj = {name: [] for name in _OBJECT_FIELDS}
+        self._extra = {}
+    
+    def _append_trade(self, trade):
+        """Write one trade dict into the column store"""
+        i = self.n_trades
+        if i == self._cap:
+            self._cap *= 2
+            for name in self._num:
+                self._num[name] = np.resize(self._num[name], self._cap)
+        
+        for name in _FLOAT_FIELDS:
+            self._num[name][i] = trade[name]
+        for name in _INTERNAL_FIELDS:
+            self._num[name][i] = trade.get(name, -1)
+        for name in _OBJECT_FIELDS:
+            self._obj[name].append(trade[name])
+        self.n_trades = i + 1
+        for values in self._extra.values():
+            values.append(None)
+        
+        extra = {k: v for k, v in trade.items() if k not in TRADE_FIELDS and k not in _INTERNAL_FIELDS}
+        if extra:
+            self.annotate_trade(i, **extra)
+    
+    def annotate_trade(self, i, **fields):
+        """
+        Attach extra columns (features, metadata) to trade i
+        
+        Args:
+            i: Trade position (-1 for the last trade)
+            **fields: Column name -> value
+        """
+        if i < 0:
+            i += self.n_trades
+        for name, value in fields.items():
+            if name not in self._extra:
+                self._extra[name] = [None] * self.n_trades
+            self._extra[name][i] = value
+    
+    def snapshot(self):
+        """
+        Copy of the trade log as columns (name -> array or list)
+        
+        Survives reset(), and pickles far more cheaply than a list of dicts.
+        """
+        n = self.n_trades
+        columns = {name: self._num[name][:n].copy() if name in self._num else list(self._obj[name])
+                   for name in TRADE_FIELDS}
+        columns.update((name, list(values)) for name, values in self._extra.items())
+        return columns
+    
+    def restore(self, columns):
+        """
+        Load a trade log from snapshot() output or a DataFrame with the same columns
+        
+        Capital is reset to the starting capital.
+        """
+        self.reset()
+        n = len(columns['pnl_dollars'])
+        if n > self._cap:
+            self._cap = n
+            for name in self._num:
+                self._num[name] = np.empty(n, dtype=self._num[name].dtype)
         
+        for name in _FLOAT_FIELDS:
+            self._num[name][:n] = columns[name]
+        for name in _INTERNAL_FIELDS:
+            self._num[name][:n] = columns[name] if name in columns else -1
+        for name in _OBJECT_FIELDS:
+            self._obj[name] = list(columns[name])
+        self._extra = {name: list(columns[name]) for name in columns
+                       if name not in TRADE_FIELDS and name not in _INTERNAL_FIELDS}
+        self.n_trades = n
+    
+    def to_frame(self):
+        """Trade log as a DataFrame, built straight from the column arrays"""
+        n = self.n_trades
+        data = {name: self._num[name][:n] if name in self._num else self._obj[name]
+                for name in TRADE_FIELDS}
+        data.update(self._extra)
+        return pd.DataFrame(data)
+    
+    def _get_price_arrays(self, df):
+        """Column arrays for df, extracted once and reused for every trade on it"""
+        if self._price_df is not df:
+            self._price_df = df
+            times = df['time'].array
+            # highs/lows are only compared against SL/TP, so float32 halves the
+            # scan's memory traffic; closes stay float64 for timeout exit prices
+            self._price_arrays = (
+                df['high'].to_numpy(dtype=np.float32),
+                df['low'].to_numpy(dtype=np.float32),
+                df['close'].to_numpy(dtype=np.float64),
+                times,
+                dict(zip(times, range(len(times)))),
+            )
+        return self._price_arrays
+    
     def calculate_position_size(self, entry_price, stop_loss_price):
         """
         Calculate position size based on risk
@@ -32,7 +201,7 @@ class BacktestEngine:
         
         return round(position_size, 2)
     
-    def simulate_trade(self, direction, entry_price, stop_loss, take_profit, entry_time, df):
+    def simulate_trade(self, direction, entry_price, stop_loss, take_profit, entry_time, df, entry_idx=None):
         """
         Simulate a single trade
         
@@ -43,54 +212,88 @@ class BacktestEngine:
             take_profit: Take profit price
             entry_time: When trade was entered
             df: Full OHLC dataframe to simulate price movement
+            entry_idx: Row position of the entry candle (looked up from entry_time if omitted)
             
         Returns:
             Trade result dictionary
         """
-        entry_idx = df[df['time'] == entry_time].index[0]
+        highs, lows, closes, times, time_to_idx = self._get_price_arrays(df)
         
-        position_size = self.calculate_position_size(entry_price, stop_loss)
+        if entry_idx is None:
+            entry_idx = time_to_idx[entry_time]
         
-        exit_price = None
-        exit_time = None
-        exit_reason = None
+        exit_idx, reason_code = _scan_exit(
+            highs, lows, int(entry_idx), MAX_CANDLES_TO_HOLD,
+            np.float32(stop_loss), np.float32(take_profit), direction == 'long'
+        )
+        exit_price = (stop_loss, take_profit, closes[exit_idx])[reason_code]
         
-        max_candles_to_hold = 20
+        return self.record_trade(direction, entry_price, stop_loss, take_profit, entry_time,
+                                 exit_idx, exit_price, reason_code, df)
+    
+    def scan_exits(self, df, entry_idx, stop_loss, take_profit, is_long, max_hold=MAX_CANDLES_TO_HOLD):
+        """
+        Find the exit of many trades at once (vectorised over signals)
         
-        for i in range(entry_idx + 1, min(entry_idx + max_candles_to_hold, len(df))):
-            candle = df.iloc[i]
-            
-            if direction == 'long':
-                if candle['low'] <= stop_loss:
-                    exit_price = stop_loss
-                    exit_time = candle['time']
-                    exit_reason = 'stop_loss'
-                    break
-                
-                if candle['high'] >= take_profit:
-                    exit_price = take_profit
-                    exit_time = candle['time']
-                    exit_reason = 'take_profit'
-                    break
+        Builds an (M x max_hold) window of candles after each entry and takes
+        the first SL/TP hit per row. A stop loss wins if both are touched on
+        the same candle, matching simulate_trade.
+        
+        Args:
+            df: Full OHLC dataframe
+            entry_idx, stop_loss, take_profit, is_long: Arrays with one value per trade
             
-            else:
-                if candle['high'] >= stop_loss:
-                    exit_price = stop_loss
-                    exit_time = candle['time']
-                    exit_reason = 'stop_loss'
-                    break
-                
-                if candle['low'] <= take_profit:
-                    exit_price = take_profit
-                    exit_time = candle['time']
-                    exit_reason = 'take_profit'
-                    break
-        
-        if exit_price is None:
-            exit_candle = df.iloc[min(entry_idx + max_candles_to_hold, len(df) - 1)]
-            exit_price = exit_candle['close']
-            exit_time = exit_candle['time']
-            exit_reason = 'timeout'
+        Returns:
+            (exit_idx, exit_price, exit_reason_code) arrays
+        """
+        highs, lows, closes, _, _ = self._get_price_arrays(df)
+        n = len(closes)
+        
+        entry_idx = np.asarray(entry_idx, dtype=np.int64)
+        stop_loss = np.asarray(stop_loss, dtype=np.float64)
+        take_profit = np.asarray(take_profit, dtype=np.float64)
+        is_long = np.asarray(is_long, dtype=bool)
+        
+        window_idx = entry_idx[:, None] + np.arange(1, max_hold)[None, :]
+        in_range = window_idx < n
+        window_idx = np.minimum(window_idx, n - 1)
+        highs_w = highs[window_idx]
+        lows_w = lows[window_idx]
+        
+        sl = stop_loss.astype(np.float32)[:, None]
+        tp = take_profit.astype(np.float32)[:, None]
+        long_ = is_long[:, None]
+        hit_sl = np.where(long_, lows_w <= sl, highs_w >= sl) & in_range
+        hit_tp = np.where(long_, highs_w >= tp, lows_w <= tp) & in_range
+        
+        first_sl = np.where(hit_sl.any(axis=1), hit_sl.argmax(axis=1), max_hold)
+        first_tp = np.where(hit_tp.any(axis=1), hit_tp.argmax(axis=1), max_hold)
+        sl_first = (first_sl < max_hold) & (first_sl <= first_tp)
+        tp_first = (first_tp < max_hold) & ~sl_first
+        
+        timeout_idx = np.minimum(entry_idx + max_hold, n - 1)
+        exit_idx = np.where(sl_first, entry_idx + 1 + first_sl,
+                            np.where(tp_first, entry_idx + 1 + first_tp, timeout_idx))
+        exit_price = np.where(sl_first, stop_loss,
+                              np.where(tp_first, take_profit, closes[timeout_idx]))
+        exit_reason = np.where(sl_first, EXIT_STOP_LOSS,
+                               np.where(tp_first, EXIT_TAKE_PROFIT, EXIT_TIMEOUT))
+        
+        return exit_idx, exit_price, exit_reason
+    
+    def record_trade(self, direction, entry_price, stop_loss, take_profit, entry_time,
+                     exit_idx, exit_price, exit_reason_code, df):
+        """
+        Book a trade whose exit is already known (see scan_exits)
+        
+        Returns:
+            Trade result dictionary
+        """
+        times = self._get_price_arrays(df)[3]
+        exit_idx = int(exit_idx)
+        exit_price = float(exit_price)
+        
+        position_size = self.calculate_position_size(entry_price, stop_loss)
         
         if direction == 'long':
             pnl_pips = exit_price - entry_price
@@ -103,7 +306,7 @@ class BacktestEngine:
         
         trade = {
             'entry_time': entry_time,
-            'exit_time': exit_time,
+            'exit_time': times[exit_idx],
             'direction': direction,
             'entry_price': entry_price,
             'exit_price': exit_price,
@@ -112,42 +315,46 @@ class BacktestEngine:
             'position_size': position_size,
             'pnl_dollars': pnl_dollars,
             'pnl_pct': (pnl_dollars / self.initial_capital) * 100,
-            'exit_reason': exit_reason,
+            'exit_reason': EXIT_REASONS[exit_reason_code],
+            'exit_idx': exit_idx,
             'capital_after': self.capital
         }
         
-        self.trades.append(trade)
+        self._append_trade(trade)
         
         return trade
     
     def get_statistics(self):
         """Calculate backtest performance metrics"""
-        if not self.trades:
+        if self.n_trades == 0:
             return None
         
-        df_trades = pd.DataFrame(self.trades)
+        pnl = self._num['pnl_dollars'][:self.n_trades]
+        wins_mask = pnl > 0
+        wins = pnl[wins_mask]
+        losses = pnl[~wins_mask & (pnl < 0)]
         
-        total_trades = len(df_trades)
-        winning_trades = len(df_trades[df_trades['pnl_dollars'] > 0])
-        losing_trades = len(df_trades[df_trades['pnl_dollars'] < 0])
+        total_trades = len(pnl)
+        winning_trades = len(wins)
+        losing_trades = len(losses)
         
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
         
-        total_profit = df_trades[df_trades['pnl_dollars'] > 0]['pnl_dollars'].sum()
-        total_loss = abs(df_trades[df_trades['pnl_dollars'] < 0]['pnl_dollars'].sum())
+        total_profit = wins.sum()
+        total_loss = abs(losses.sum())
         
         profit_factor = (total_profit / total_loss) if total_loss > 0 else 0
         
         net_profit = self.capital - self.initial_capital
         net_profit_pct = (net_profit / self.initial_capital) * 100
         
-        capital_curve = df_trades['capital_after'].values
+        capital_curve = self.initial_capital + np.cumsum(pnl)
         running_max = np.maximum.accumulate(capital_curve)
         drawdown = (capital_curve - running_max) / running_max * 100
         max_drawdown = abs(drawdown.min())
         
-        avg_win = df_trades[df_trades['pnl_dollars'] > 0]['pnl_dollars'].mean() if winning_trades > 0 else 0
-        avg_loss = df_trades[df_trades['pnl_dollars'] < 0]['pnl_dollars'].mean() if losing_trades > 0 else 0
+        avg_win = wins.mean() if winning_trades > 0 else 0
+        avg_loss = losses.mean() if losing_trades > 0 else 0
         
         return {
             'total_trades': total_trades,
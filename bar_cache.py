@@ -0,0 +1,94 @@
+import os
+import pandas as pd
+
+
+class BarCache:
+    """
+    Rolling candle windows per timeframe, persisted to disk
+
+    Sits in front of MarketDataFetcher.get_candles. Once a timeframe's
+    window is known (from memory or logs/bars_<symbol>_<tf>.parquet), a
+    request only downloads the bars since the last cached one - usually
+    the bar that just closed plus the one that just opened - and merges
+    them in. It falls back to a full download when nothing overlaps.
+    """
+
+    def __init__(self, fetcher, path_template='logs/bars_{symbol}_{timeframe_min}.parquet'):
+        """
+        Args:
+            fetcher: Connected MarketDataFetcher used for downloads
+            path_template: Where each timeframe's window is saved (None = memory only)
+        """
+        self.fetcher = fetcher
+        self.path_template = path_template
+        self._frames = {}
+
+    def _path(self, timeframe_min):
+        if not self.path_template:
+            return None
+        return self.path_template.format(symbol=self.fetcher.symbol, timeframe_min=timeframe_min)
+
+    def _load(self, timeframe_min):
+        """Read a saved window, or None if it is missing or unreadable"""
+        path = self._path(timeframe_min)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"⚠️  Ignoring bar cache {path}: {e}")
+            return None
+
+    def _store(self, timeframe_min, df):
+        """Keep df as the timeframe's window and rewrite its file atomically"""
+        self._frames[timeframe_min] = df
+        path = self._path(timeframe_min)
+        if not path:
+            return df
+        # Per-process temp name, so scripts run side by side never write the same file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"⚠️  Could not save bar cache: {e}")
+        return df
+
+    def get_candles(self, timeframe_minutes=15, num_candles=200):
+        """
+        Same result as MarketDataFetcher.get_candles, fetching only new bars
+
+        Returns:
+            DataFrame of the last num_candles bars, or None on fetch error
+        """
+        if timeframe_minutes not in self._frames:
+            self._frames[timeframe_minutes] = self._load(timeframe_minutes)
+        cached = self._frames[timeframe_minutes]
+
+        if cached is not None and len(cached) > 0:
+            last_cached = cached['time'].iloc[-1]
+            count = 2
+            # Widen the request until it overlaps the cache (e.g. after a restart)
+            while count < num_candles:
+                recent = self.fetcher.get_candles(timeframe_minutes=timeframe_minutes, num_candles=count)
+                if recent is None:
+                    break
+                if recent['time'].iloc[0] <= last_cached:
+                    kept = cached[cached['time'] < recent['time'].iloc[0]]
+                    merged = pd.concat([kept, recent], ignore_index=True)
+                    if len(merged) >= num_candles:
+                        # Keep the longer of the cached and requested windows, so a short
+                        # request (e.g. a test script) doesn't shrink another caller's cache
+                        window = self._store(timeframe_minutes,
+                                             merged.iloc[-max(num_candles, len(cached)):].reset_index(drop=True))
+                        if len(window) == num_candles:
+                            return window
+                        return window.iloc[-num_candles:].reset_index(drop=True)
+                    break
+                count *= 8
+
+        df = self.fetcher.get_candles(timeframe_minutes=timeframe_minutes, num_candles=num_candles)
+        if df is None:
+            return None
+        return self._store(timeframe_minutes, df)
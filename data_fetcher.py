@@ -29,8 +29,8 @@ rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, num_candles)
 
 mt5.shutdown()
 
-df = pd.DataFrame(rates)
-df['time'] = pd.to_datetime(df['time'], unit='s')
+df = pd.DataFrame(rates, copy=False)
+df['time'] = pd.to_datetime(df['time'].to_numpy(), unit='s')
 
 print(f"\nFetched {len(df)} candles:")
 print(df.head(10))
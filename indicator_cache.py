@@ -0,0 +1,304 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pandas_ta_classic as ta
+from _njit import njit
+
+RSI_LENGTH = 14
+ATR_LENGTH = 14
+EMA_LENGTHS = (20, 50, 200)
+VOLUME_MA_LENGTH = 20
+
+# Columns a bar's indicators are computed from; a cached row is reused only if these still match
+INPUT_COLUMNS = ('high', 'low', 'close', 'volume')
+INDICATOR_COLUMNS = ('rsi', 'ema_20', 'ema_50', 'ema_200', 'atr', 'volume_ma', 'volume_ratio')
+# Wilder smoothing state needed to carry RSI forward one bar at a time
+STATE_COLUMNS = ('rsi_avg_gain', 'rsi_avg_loss')
+
+
+@njit(cache=True)
+def _fused_ema(close, lengths, seeds):
+    """
+    EMAs of several lengths in a single pass over close
+
+    Each one starts from seeds[j] (the SMA of its first `length` closes)
+    at bar length - 1 and is NaN before that, like pandas_ta's ema.
+
+    Returns:
+        float64 array of shape (len(lengths), len(close))
+    """
+    n = len(close)
+    k = len(lengths)
+    out = np.full((k, n), np.nan)
+    ema = seeds.copy()
+
+    for i in range(n):
+        price = close[i]
+        for j in range(k):
+            length = lengths[j]
+            if i == length - 1:
+                out[j, i] = ema[j]
+            elif i >= length:
+                alpha = 2.0 / (length + 1)
+                ema[j] = (1 - alpha) * ema[j] + alpha * price
+                out[j, i] = ema[j]
+
+    return out
+
+
+def compute_emas(close, lengths=EMA_LENGTHS):
+    """
+    ema_<length> columns for every length from one fused pass
+
+    Returns:
+        Dict of column name -> float64 array
+    """
+    close = np.asarray(close, dtype=np.float64)
+    # Seeds use numpy's pairwise mean, the same summation pandas_ta's SMA seed gets
+    seeds = np.array([close[:length].mean() if length <= len(close) else np.nan for length in lengths])
+    values = _fused_ema(close, np.array(lengths, dtype=np.int64), seeds)
+    return {f'ema_{length}': values[j] for j, length in enumerate(lengths)}
+
+
+def volume_moving_average(volume, length=VOLUME_MA_LENGTH):
+    """
+    Rolling mean of volume from one cumulative sum
+
+    Each window is the difference of two prefix sums. Integer tick volumes
+    are summed as int64, so the result matches rolling(length).mean()
+    exactly; float volumes go through a float64 cumsum.
+
+    Returns:
+        float64 array, NaN for the first length - 1 bars
+    """
+    volume = np.asarray(volume)
+    if volume.dtype.kind not in 'iu':
+        volume = volume.astype(np.float64)
+    sums = np.zeros(len(volume) + 1, dtype=np.int64 if volume.dtype.kind in 'iu' else np.float64)
+    np.cumsum(volume, out=sums[1:])
+
+    ma = np.full(len(volume), np.nan)
+    ma[length - 1:] = (sums[length:] - sums[:-length]) / length
+    return ma
+
+
+@njit(cache=True)
+def _wilder_smooth(values, seed_at, seed, alpha):
+    """
+    Wilder smoothing of values from bar seed_at (where it equals seed) onwards, NaN before
+
+    Same recursion as pandas' ewm(alpha=alpha, adjust=False) after pandas_ta's SMA seed.
+    """
+    out = np.full(len(values), np.nan)
+    if seed_at >= len(values):
+        return out
+    average = seed
+    out[seed_at] = average
+    for i in range(seed_at + 1, len(values)):
+        average = (1 - alpha) * average + alpha * values[i]
+        out[i] = average
+    return out
+
+
+def average_true_range(high, low, close, length=ATR_LENGTH):
+    """
+    Wilder ATR, bit-for-bit the same as pandas_ta's atr without its pandas overhead
+
+    Returns:
+        float64 array, NaN until the first `length` true ranges are in
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    high_low = high - low
+    # pandas_ta's non_zero_range nudges the whole range series off zero
+    if (high_low == 0).any():
+        high_low = high_low + sys.float_info.epsilon
+    prev_close = np.empty_like(close)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+    # fmax skips NaN like pandas' row-wise max
+    true_range = np.fmax(np.abs(high_low), np.fmax(np.abs(high - prev_close), np.abs(prev_close - low)))
+    finite = np.isfinite(high) & np.isfinite(low) & np.isfinite(close)
+    start = int(finite.argmax()) if finite.any() else len(finite)
+    true_range[:start + 1] = np.nan
+
+    valid = np.flatnonzero(~np.isnan(true_range))
+    if len(valid) == 0 or valid[0] + length > len(true_range):
+        return np.full(len(true_range), np.nan)
+    first = valid[0]
+    seed = np.nanmean(true_range[first:first + length])
+    return _wilder_smooth(true_range, first + length - 1, seed, 1.0 / length)
+
+
+def rsi_averages(close):
+    """
+    Wilder average gain / loss behind RSI, as STATE_COLUMNS arrays
+
+    RSI alone can't be stepped forward (it only keeps their ratio), so
+    these are what extend_indicators carries from bar to bar.
+    """
+    change = pd.Series(close, dtype=np.float64).diff()
+    averages = {}
+    for col, moves in (('rsi_avg_gain', change.clip(lower=0)), ('rsi_avg_loss', (-change).clip(lower=0))):
+        average = ta.rma(moves, length=RSI_LENGTH)
+        # pandas_ta returns None when there are fewer bars than the length
+        averages[col] = np.full(len(change), np.nan) if average is None else average.to_numpy(dtype=np.float64)
+    return averages
+
+
+def extend_indicators(high, low, close, volume, columns, start):
+    """
+    Fill bars start..end of columns by carrying each recursion forward one bar
+
+    Args:
+        high, low, close, volume: float64 input arrays
+        columns: INDICATOR_COLUMNS + STATE_COLUMNS arrays, valid before start
+        start: First bar to fill (bar start - 1 must be seeded)
+    """
+    rsi_alpha = 1.0 / RSI_LENGTH
+    atr_alpha = 1.0 / ATR_LENGTH
+
+    for i in range(start, len(close)):
+        prev_close = close[i - 1]
+        change = close[i] - prev_close
+
+        gain = (1 - rsi_alpha) * columns['rsi_avg_gain'][i - 1] + rsi_alpha * max(change, 0.0)
+        loss = (1 - rsi_alpha) * columns['rsi_avg_loss'][i - 1] + rsi_alpha * max(-change, 0.0)
+        columns['rsi_avg_gain'][i] = gain
+        columns['rsi_avg_loss'][i] = loss
+        columns['rsi'][i] = 100 * gain / (gain + loss)
+
+        for length in EMA_LENGTHS:
+            alpha = 2.0 / (length + 1)
+            col = f'ema_{length}'
+            columns[col][i] = (1 - alpha) * columns[col][i - 1] + alpha * close[i]
+
+        true_range = max(high[i] - low[i], abs(high[i] - prev_close), abs(prev_close - low[i]))
+        columns['atr'][i] = (1 - atr_alpha) * columns['atr'][i - 1] + atr_alpha * true_range
+
+        if i >= VOLUME_MA_LENGTH - 1:
+            volume_ma = volume[i - VOLUME_MA_LENGTH + 1:i + 1].mean()
+            columns['volume_ma'][i] = volume_ma
+            columns['volume_ratio'][i] = volume[i] / volume_ma
+
+
+class IndicatorCache:
+    """
+    Per-bar indicator cache keyed by candle time
+
+    The first frame is computed in full (same pandas_ta calls as
+    PatternDetector). After that only bars that are new, or whose OHLCV
+    changed since they were cached (the bar that was still forming), are
+    computed, by carrying the EMA / Wilder RSI / Wilder ATR recursions
+    forward from the previous bar.
+    """
+
+    def __init__(self, path='logs/indicator_cache.parquet'):
+        """
+        Args:
+            path: Parquet file used to warm-start across restarts (None = memory only)
+        """
+        self.path = path
+        self._cache = self._load()
+
+    def _load(self):
+        """Read the on-disk cache, or None if it is missing or unreadable"""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            cache = pd.read_parquet(self.path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"⚠️  Ignoring indicator cache {self.path}: {e}")
+            return None
+        print(f"✓ Loaded {len(cache)} cached indicator rows from {self.path}")
+        return cache
+
+    def save(self):
+        """Write the cache to disk so a restarted scanner warm-starts"""
+        if not self.path or self._cache is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._cache.to_parquet(self.path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"⚠️  Could not save indicator cache: {e}")
+
+    def apply(self, df):
+        """
+        Attach indicator columns to a candle frame
+
+        Args:
+            df: DataFrame with columns: time, open, high, low, close, volume
+
+        Returns:
+            Copy of df with INDICATOR_COLUMNS added
+        """
+        n = len(df)
+        reused = self._matching_prefix(df)
+
+        if reused == 0:
+            columns = self._compute_full(df)
+        else:
+            cached = self._cache.loc[df['time'].iloc[:reused]]
+            columns = {}
+            for col in INDICATOR_COLUMNS + STATE_COLUMNS:
+                values = np.full(n, np.nan)
+                values[:reused] = cached[col].to_numpy()
+                columns[col] = values
+            if reused < n:
+                self._extend(df, columns, reused)
+
+        out = df.copy()
+        for col in INDICATOR_COLUMNS:
+            out[col] = columns[col]
+
+        fresh = pd.DataFrame({col: df[col].to_numpy() for col in INPUT_COLUMNS}, index=pd.Index(df['time'], name='time'))
+        for col in INDICATOR_COLUMNS + STATE_COLUMNS:
+            fresh[col] = columns[col]
+        self._cache = fresh
+        if reused < n:
+            self.save()
+
+        return out
+
+    def _matching_prefix(self, df):
+        """Number of leading bars of df whose inputs are unchanged in the cache"""
+        if self._cache is None or len(df) == 0:
+            return 0
+
+        cached = self._cache.reindex(df['time'])
+        same = np.ones(len(df), dtype=bool)
+        for col in INPUT_COLUMNS:
+            same &= cached[col].to_numpy() == df[col].to_numpy(dtype=np.float64)
+        reused = len(df) if same.all() else int(np.argmin(same))
+
+        # The recursions need a seeded previous bar to continue from
+        if 0 < reused < len(df):
+            last = cached.iloc[reused - 1]
+            if any(np.isnan(last[col]) for col in INDICATOR_COLUMNS + STATE_COLUMNS):
+                return 0
+        return reused
+
+    def _compute_full(self, df):
+        """All indicators from scratch, identical to PatternDetector's own calculation"""
+        close = df['close']
+        columns = {
+            'rsi': ta.rsi(close, length=RSI_LENGTH),
+            'atr': average_true_range(df['high'].to_numpy(), df['low'].to_numpy(), close.to_numpy()),
+        }
+        columns.update(compute_emas(close.to_numpy(dtype=np.float64)))
+        columns['volume_ma'] = volume_moving_average(df['volume'].to_numpy())
+        columns['volume_ratio'] = df['volume'].to_numpy(dtype=np.float64) / columns['volume_ma']
+
+        columns.update(rsi_averages(close.to_numpy(dtype=np.float64)))
+
+        return {col: pd.Series(values).to_numpy(dtype=np.float64) for col, values in columns.items()}
+
+    def _extend(self, df, columns, start):
+        """Fill bars start..end of columns by carrying each recursion forward one bar"""
+        extend_indicators(df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64),
+                          df['close'].to_numpy(dtype=np.float64), df['volume'].to_numpy(dtype=np.float64),
+                          columns, start)
@@ -1,10 +1,17 @@
+import atexit
 import time
+from collections import namedtuple
 from datetime import datetime
 import os
+import http.client
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 from market_data import MarketDataFetcher
+from bar_cache import BarCache
 from pattern_detector import PatternDetector
+from indicator_cache import IndicatorCache
+from multi_timeframe import MultiTimeframeAnalyzer
 
 
 def _safe_float(v, default=0.0) -> float:
@@ -16,13 +23,22 @@ def _safe_float(v, default=0.0) -> float:
         return float(default)
 
 
-def _send_telegram_message(text: str) -> bool:
+# Values of the signal candle read once for scoring and alerting (0.0 where a column is missing)
+CandleSnap = namedtuple('CandleSnap', 'time open high low close rsi ema20 ema50 atr vol_ratio')
+_SNAP_COLUMNS = ('open', 'high', 'low', 'close', 'rsi', 'ema_20', 'ema_50', 'atr', 'volume_ratio')
+
+
+def _candle_snap(df, idx) -> CandleSnap:
+    return CandleSnap(df['time'].iat[idx],
+                      *(_safe_float(df[col].iat[idx]) if col in df.columns else 0.0 for col in _SNAP_COLUMNS))
+
+
+def _send_telegram_message(text: str, connection=None) -> bool:
     token = os.getenv('TELEGRAM_BOT_TOKEN')
     chat_id = os.getenv('TELEGRAM_CHAT_ID')
     if not token or not chat_id:
         return False
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {
         'chat_id': chat_id,
         'text': text,
@@ -31,27 +47,62 @@ def _send_telegram_message(text: str) -> bool:
     }
 
     data = urllib.parse.urlencode(payload).encode('utf-8')
+    # A passed-in connection is kept alive between messages (saves the TLS handshake)
+    conn = connection if connection is not None else http.client.HTTPSConnection('api.telegram.org', timeout=15)
     try:
-        req = urllib.request.Request(url, data=data, method='POST')
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            return 200 <= int(resp.status) < 300
+        for attempt in range(2):
+            try:
+                conn.request('POST', f"/bot{token}/sendMessage", body=data,
+                             headers={'Content-Type': 'application/x-www-form-urlencoded'})
+                resp = conn.getresponse()
+                resp.read()
+                return 200 <= int(resp.status) < 300
+            except (http.client.RemoteDisconnected, ConnectionError, BrokenPipeError):
+                # Telegram closes idle keep-alive sockets long before the next bar's
+                # alert; reconnect and send once more before giving up
+                conn.close()
+                if attempt:
+                    return False
     except Exception:
+        # Drop the broken socket; http.client reopens it on the next request
+        conn.close()
         return False
+    finally:
+        if connection is None:
+            conn.close()
+
+
+def _report_telegram_result(future) -> None:
+    if future.result():
+        print("✓ Telegram alert sent")
+    elif os.getenv('TELEGRAM_BOT_TOKEN') and os.getenv('TELEGRAM_CHAT_ID'):
+        print("⚠️  Telegram alert failed to send")
 
 class LiveScanner:
     """Continuously scans for trading patterns"""
     
-    def __init__(self, timeframe_min=15, scan_interval_sec=60, auto_trade=False):
+    def __init__(self, timeframe_min=15, scan_interval_sec=60, auto_trade=False, tick_poll_sec=0.5):
         """
         Args:
             timeframe_min: Timeframe to scan (15 min recommended)
-            scan_interval_sec: How often to check for new candles
+            scan_interval_sec: How long to back off when no ticks are coming in (market closed)
             auto_trade: Enable automatic trade execution (DEMO ONLY)
+            tick_poll_sec: How often to poll the latest tick around a bar close
         """
         self.timeframe_min = timeframe_min
         self.scan_interval_sec = scan_interval_sec
+        self.tick_poll_sec = tick_poll_sec
         self.fetcher = MarketDataFetcher()
         self.last_candle_time = None
+        self.last_bar_start = None
+        # Broker server time minus local time, taken from the freshest tick seen
+        self._server_offset = None
+        
+        # Rolling windows of recent bars per timeframe, topped up incrementally on each new bar
+        self.num_candles = 300
+        self.bars = BarCache(self.fetcher)
+        # Indicator values per candle time, reused across scans and restarts
+        self._indicator_cache = IndicatorCache('logs/indicator_cache.parquet')
 
         self.min_confidence = 75
         self.auto_trade_min_confidence = 85
@@ -64,16 +115,30 @@ class LiveScanner:
             self.executor = OrderExecutor()
             self.executor.connect()
         
+        # Telegram alerts go out on a background thread so a slow API can't stall the scan loop.
+        # One worker keeps alerts in order and lets them share one keep-alive connection.
+        self._alert_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='telegram')
+        self._telegram_conn = http.client.HTTPSConnection('api.telegram.org', timeout=15)
+        
+        # Signal log stays open for the scanner's lifetime instead of being reopened per alert
+        self._signal_log = open('logs/signals.txt', 'a', buffering=8192)
+        atexit.register(self._signal_log.close)
+        
+        # One MT5 session for the scanner's lifetime, shared with the H1/H4 trend checks
+        self.fetcher.connect()
+        self.mtf = MultiTimeframeAnalyzer(fetcher=self.fetcher, bar_cache=self.bars)
+        
     def scan_once(self):
         """Perform one scan"""
         print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Scanning...")
         
-        self.fetcher.connect()
-        df = self.fetcher.get_candles(timeframe_minutes=self.timeframe_min, num_candles=300)
+        self.fetcher.ensure_connected()
+        df = self.bars.get_candles(timeframe_minutes=self.timeframe_min, num_candles=self.num_candles)
+        if df is None:
+            return None
         current_price_info = self.fetcher.get_current_price()
-        self.fetcher.disconnect()
         
-        latest_candle_time = df.iloc[-1]['time']
+        latest_candle_time = df['time'].iat[-1]
         
         if self.last_candle_time and latest_candle_time == self.last_candle_time:
             print("  No new candle yet, waiting...")
@@ -82,32 +147,31 @@ class LiveScanner:
         self.last_candle_time = latest_candle_time
         print(f"  New candle detected at {latest_candle_time}")
         
-        detector = PatternDetector(df)
-
-        df = detector.df
-
-        falling_wedge_signals = detector.detect_falling_wedge(lookback=20)
+        # apply() already returns a fresh frame, so the detector can work on it directly
+        df = self._indicator_cache.apply(df)
+        detector = PatternDetector(df, inplace=True)
 
         latest_idx = len(df) - 1
         
+        # Only the latest candle can trigger an alert, so only it is checked
+        falling_wedge_signal = detector.detect_falling_wedge_at(latest_idx, lookback=20)
+        
         signal_found = None
 
-        for signal in falling_wedge_signals:
-            if signal.get('index') == latest_idx:
-                candle = df.iloc[latest_idx]
-                confidence, context = self._score_falling_wedge(candle=candle, price_info=current_price_info, df=df)
-                signal_found = {
-                    'type': 'FALLING_WEDGE',
-                    'direction': 'LONG',
-                    'price': float(candle['close']),
-                    'confidence': confidence,
-                    'context': context,
-                }
-                break
+        if falling_wedge_signal is not None:
+            candle = _candle_snap(df, latest_idx)
+            confidence, context = self._score_falling_wedge(candle=candle, price_info=current_price_info, df=df)
+            signal_found = {
+                'type': 'FALLING_WEDGE',
+                'direction': 'LONG',
+                'price': candle.close,
+                'confidence': confidence,
+                'context': context,
+            }
         
         if signal_found:
             if signal_found.get('confidence', 0) >= self.min_confidence:
-                self._alert_signal(signal_found, df.iloc[-1], price_info=current_price_info)
+                self._alert_signal(signal_found, candle, price_info=current_price_info)
                 return signal_found
             else:
                 print(f"  Signal found but confidence too low ({signal_found.get('confidence', 0):.1f} < {self.min_confidence})")
@@ -125,11 +189,11 @@ class LiveScanner:
         if spread > self.max_spread:
             confidence -= 25
 
-        rsi = _safe_float(candle['rsi']) if 'rsi' in candle.index else 0.0
-        ema20 = _safe_float(candle['ema_20']) if 'ema_20' in candle.index else 0.0
-        ema50 = _safe_float(candle['ema_50']) if 'ema_50' in candle.index else 0.0
-        atr = _safe_float(candle['atr']) if 'atr' in candle.index else 0.0
-        vol_ratio = _safe_float(candle['volume_ratio']) if 'volume_ratio' in candle.index else 0.0
+        rsi = candle.rsi
+        ema20 = candle.ema20
+        ema50 = candle.ema50
+        atr = candle.atr
+        vol_ratio = candle.vol_ratio
 
         trend_ok = (ema20 > ema50) if (ema20 and ema50) else False
         if trend_ok:
@@ -148,35 +212,37 @@ class LiveScanner:
         sr_at_support = False
         sr_strength = 0
         sr_level = None
-        try:
-            from support_resistance import SupportResistanceDetector
-            sr_detector = SupportResistanceDetector(df, lookback_candles=150)
-            sr_at_support, sr_info = sr_detector.is_at_support(float(candle['close']), tolerance_pct=0.3)
-            if sr_info:
-                sr_strength = int(sr_info.get('strength', 0))
-                sr_level = float(sr_info.get('price'))
-            if sr_at_support and sr_strength >= self.sr_min_strength:
-                confidence += 10
-        except Exception:
-            pass
-
         h1_trend = None
         h4_trend = None
-        try:
-            from multi_timeframe import MultiTimeframeAnalyzer
-            mtf = MultiTimeframeAnalyzer()
-            h1_trend = mtf.check_higher_timeframe_trend(candle['time'], timeframe_min=60)
-            h4_trend = mtf.check_higher_timeframe_trend(candle['time'], timeframe_min=240)
-            if h1_trend == 'uptrend':
-                confidence += 7
-            elif h1_trend == 'downtrend':
-                confidence -= 7
-            if h4_trend == 'uptrend':
-                confidence += 8
-            elif h4_trend == 'downtrend':
-                confidence -= 8
-        except Exception:
-            pass
+
+        # S/R and the H1/H4 trends are the expensive checks and can add at most
+        # 10 + 7 + 8 points; skip them when even that can't reach the alert floor
+        if confidence + 25 >= self.min_confidence:
+            try:
+                from support_resistance import SupportResistanceDetector
+                sr_detector = SupportResistanceDetector(df, lookback_candles=150)
+                sr_at_support, sr_info = sr_detector.is_at_support(candle.close, tolerance_pct=0.3)
+                if sr_info:
+                    sr_strength = int(sr_info.get('strength', 0))
+                    sr_level = float(sr_info.get('price'))
+                if sr_at_support and sr_strength >= self.sr_min_strength:
+                    confidence += 10
+            except Exception:
+                pass
+
+            try:
+                h1_trend = self.mtf.check_higher_timeframe_trend(candle.time, timeframe_min=60)
+                h4_trend = self.mtf.check_higher_timeframe_trend(candle.time, timeframe_min=240)
+                if h1_trend == 'uptrend':
+                    confidence += 7
+                elif h1_trend == 'downtrend':
+                    confidence -= 7
+                if h4_trend == 'uptrend':
+                    confidence += 8
+                elif h4_trend == 'downtrend':
+                    confidence -= 8
+            except Exception:
+                pass
 
         confidence = max(0.0, min(100.0, confidence))
 
@@ -203,7 +269,7 @@ class LiveScanner:
         print("="*60)
         print(f"Pattern:    {signal['type']}")
         print(f"Direction:  {signal['direction']}")
-        print(f"Time:       {candle['time']}")
+        print(f"Time:       {candle.time}")
         print(f"Price:      {signal['price']:.2f}")
         if 'confidence' in signal:
             print(f"Confidence: {signal['confidence']:.1f}/100")
@@ -217,9 +283,9 @@ class LiveScanner:
                 print(f"Support:    {ctx.get('sr_level'):.2f} (Strength: {ctx.get('sr_strength', 0)})")
         
         if signal['direction'] == 'LONG':
-            entry = candle['close']
-            atr = _safe_float(candle['atr']) if 'atr' in candle.index else 0.0
-            stop = candle['low'] - (atr * 0.5 if atr else 2)
+            entry = candle.close
+            atr = candle.atr
+            stop = candle.low - (atr * 0.5 if atr else 2)
             target = entry + (entry - stop) * 2
             print(f"\nTrade Setup:")
             print(f"  Entry:      {entry:.2f}")
@@ -233,7 +299,7 @@ class LiveScanner:
             msg_lines.append("<b>🚨 TRADE ALERT</b>")
             msg_lines.append(f"<b>Pattern:</b> {signal.get('type')}")
             msg_lines.append(f"<b>Direction:</b> {signal.get('direction')}")
-            msg_lines.append(f"<b>Time:</b> {candle['time']}")
+            msg_lines.append(f"<b>Time:</b> {candle.time}")
             msg_lines.append(f"<b>Price:</b> {float(signal.get('price', entry)):.2f}")
             msg_lines.append(f"<b>Confidence:</b> {float(signal.get('confidence', 0.0)):.1f}/100")
 
@@ -258,12 +324,8 @@ class LiveScanner:
             msg_lines.append(f"TP: {target:.2f}")
             msg_lines.append("RR: 2.0")
 
-            sent = _send_telegram_message("\n".join(msg_lines))
-            if sent:
-                print("✓ Telegram alert sent")
-            else:
-                if os.getenv('TELEGRAM_BOT_TOKEN') and os.getenv('TELEGRAM_CHAT_ID'):
-                    print("⚠️  Telegram alert failed to send")
+            sent = self._alert_pool.submit(_send_telegram_message, "\n".join(msg_lines), self._telegram_conn)
+            sent.add_done_callback(_report_telegram_result)
             
             if self.auto_trade:
                 can_trade = True
@@ -284,9 +346,9 @@ class LiveScanner:
                     )
         
         else:
-            entry = candle['close']
-            atr = _safe_float(candle['atr']) if 'atr' in candle.index else 0.0
-            stop = candle['high'] + (atr * 0.5 if atr else 2)
+            entry = candle.close
+            atr = candle.atr
+            stop = candle.high + (atr * 0.5 if atr else 2)
             target = entry - (stop - entry) * 2
             print(f"\nTrade Setup:")
             print(f"  Entry:      {entry:.2f}")
@@ -300,9 +362,10 @@ class LiveScanner:
         
         print("="*60)
         
-        with open('logs/signals.txt', 'a') as f:
-            conf = signal.get('confidence', 0.0)
-            f.write(f"\n{datetime.now()} - {signal['type']} {signal.get('direction')} at {signal['price']:.2f} | conf={conf:.1f}\n")
+        conf = signal.get('confidence', 0.0)
+        self._signal_log.write(f"\n{datetime.now()} - {signal['type']} {signal.get('direction')} at {signal['price']:.2f} | conf={conf:.1f}\n")
+        # Hand the line to the OS now (no fsync) so it survives a crash or kill
+        self._signal_log.flush()
     
     def run(self):
         """Run continuous scanner"""
@@ -310,18 +373,48 @@ class LiveScanner:
         print("LIVE SCANNER STARTED")
         print("="*60)
         print(f"Timeframe:      {self.timeframe_min} minutes")
-        print(f"Scan interval:  {self.scan_interval_sec} seconds")
+        print(f"Tick poll:      {self.tick_poll_sec} seconds")
         print(f"Auto-trading:   {'ENABLED' if self.auto_trade else 'DISABLED'}")
         print(f"Signals logged to: logs/signals.txt")
         print("="*60)
         print("\nPress Ctrl+C to stop\n")
         
         try:
+            bar_sec = self.timeframe_min * 60
             while True:
-                self.scan_once()
-                time.sleep(self.scan_interval_sec)
+                tick = self.fetcher.get_tick() if self.fetcher.ensure_connected() else None
+                if tick is None:
+                    # No quotes (market closed or terminal reconnecting)
+                    time.sleep(self.scan_interval_sec)
+                    continue
+                
+                # A tick can only lag the server clock, so the largest gap seen is the best estimate
+                tick_offset = tick.time_msc / 1000 - time.time()
+                if self._server_offset is None or tick_offset > self._server_offset:
+                    self._server_offset = tick_offset
+                
+                # Only run the full pipeline once the tick crosses into a new bar
+                bar_start = tick.time - (tick.time % bar_sec)
+                if bar_start != self.last_bar_start:
+                    self.scan_once()
+                    # The bar can lag the first tick by a moment; keep polling until it shows up
+                    if self.last_candle_time is not None and self.last_candle_time >= pd.Timestamp(bar_start, unit='s'):
+                        self.last_bar_start = bar_start
+                
+                if bar_start == self.last_bar_start:
+                    # Bar already scanned: sleep until it closes on the server clock (the last tick
+                    # may be minutes old in a quiet market), then poll until a tick confirms the new bar
+                    server_now = time.time() + self._server_offset
+                    time.sleep(max(self.tick_poll_sec, bar_start + bar_sec - server_now))
+                else:
+                    time.sleep(self.tick_poll_sec)
                 
         except KeyboardInterrupt:
             print("\n\nScanner stopped by user")
+            # Let queued alerts go out before exiting
+            self._alert_pool.shutdown(wait=True)
+            self._telegram_conn.close()
+            self._signal_log.close()
+            self.fetcher.disconnect()
             if self.auto_trade:
                 self.executor.disconnect()
@@ -1,13 +1,27 @@
 import MetaTrader5 as mt5
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+# Minutes -> MT5 timeframe constant
+_TF_MAP = {
+    1: mt5.TIMEFRAME_M1,
+    5: mt5.TIMEFRAME_M5,
+    15: mt5.TIMEFRAME_M15,
+    30: mt5.TIMEFRAME_M30,
+    60: mt5.TIMEFRAME_H1,
+    240: mt5.TIMEFRAME_H4,
+    1440: mt5.TIMEFRAME_D1
+}
+
 class MarketDataFetcher:
     """Handles all MT5 data fetching operations"""
     
     def __init__(self, symbol="XAUUSDm"):
         self.symbol = symbol
         self.connected = False
+        self._executor = None
+        self._point = None
         
     def connect(self):
         """Initialize MT5 connection"""
@@ -24,8 +38,25 @@ class MarketDataFetcher:
         print(f"✓ Connected to MT5, {self.symbol} ready")
         return True
     
+    def ensure_connected(self):
+        """
+        Cheap health check for a long-lived connection; reconnects if the
+        terminal has gone away
+        
+        Returns:
+            True if connected
+        """
+        if self.connected and mt5.terminal_info() is not None:
+            return True
+        self.connected = False
+        return self.connect()
+    
     def disconnect(self):
         """Close MT5 connection"""
+        if self._executor is not None:
+            # Let any prefetch finish before the terminal goes away
+            self._executor.shutdown(wait=True)
+            self._executor = None
         mt5.shutdown()
         self.connected = False
         print("✓ MT5 connection closed")
@@ -45,51 +76,73 @@ class MarketDataFetcher:
             print("ERROR: Not connected to MT5")
             return None
         
-        timeframe_map = {
-            1: mt5.TIMEFRAME_M1,
-            5: mt5.TIMEFRAME_M5,
-            15: mt5.TIMEFRAME_M15,
-            30: mt5.TIMEFRAME_M30,
-            60: mt5.TIMEFRAME_H1,
-            240: mt5.TIMEFRAME_H4,
-            1440: mt5.TIMEFRAME_D1
-        }
-        
-        if timeframe_minutes not in timeframe_map:
+        timeframe = _TF_MAP.get(timeframe_minutes)
+        if timeframe is None:
             print(f"ERROR: Invalid timeframe {timeframe_minutes}")
             return None
         
-        timeframe = timeframe_map[timeframe_minutes]
-        
         rates = mt5.copy_rates_from_pos(self.symbol, timeframe, 0, num_candles)
         
         if rates is None or len(rates) == 0:
             print("ERROR: No data received from MT5")
             return None
         
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        
-        df = df.rename(columns={
-            'tick_volume': 'volume'
-        })
-        
-        df = df[['time', 'open', 'high', 'low', 'close', 'volume']]
+        # Columns are zero-copy views of the structured array's fields; only
+        # time is converted (epoch seconds -> datetime64[ns])
+        df = pd.DataFrame({
+            'time': pd.to_datetime(rates['time'], unit='s'),
+            'open': rates['open'],
+            'high': rates['high'],
+            'low': rates['low'],
+            'close': rates['close'],
+            'volume': rates['tick_volume'],
+        }, copy=False)
         
         print(f"✓ Fetched {len(df)} candles ({timeframe_minutes}min timeframe)")
         return df
     
+    def prefetch_candles(self, timeframe_minutes=15, num_candles=200):
+        """
+        Start get_candles in the background so the caller can do other setup
+        
+        MT5 calls are kept on a single worker thread, so prefetches run one
+        at a time in submission order.
+        
+        Returns:
+            concurrent.futures.Future whose result() is the get_candles DataFrame
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mt5-fetch')
+        return self._executor.submit(self.get_candles, timeframe_minutes, num_candles)
+    
+    def get_tick(self):
+        """
+        Latest tick for the symbol
+        
+        Returns:
+            MT5 tick (time, bid, ask, ...) or None if the terminal has none
+        """
+        if not self.connected:
+            print("ERROR: Not connected to MT5")
+            return None
+        
+        return mt5.symbol_info_tick(self.symbol)
+    
     def get_current_price(self):
         """Get current bid/ask prices"""
         if not self.connected:
             print("ERROR: Not connected to MT5")
             return None
         
-        symbol_info = mt5.symbol_info(self.symbol)
+        # Point size never changes, so symbol_info is only fetched once;
+        # bid/ask always come from a fresh tick
+        if self._point is None:
+            self._point = mt5.symbol_info(self.symbol).point
+        tick = mt5.symbol_info_tick(self.symbol)
         
         return {
             'time': datetime.now(),
-            'bid': symbol_info.bid,
-            'ask': symbol_info.ask,
-            'spread': symbol_info.spread
+            'bid': tick.bid,
+            'ask': tick.ask,
+            'spread': int(round((tick.ask - tick.bid) / self._point))
         }
@@ -1,34 +1,56 @@
+import numpy as np
 from market_data import MarketDataFetcher
 
 class MultiTimeframeAnalyzer:
     """Analyze patterns across multiple timeframes"""
     
-    def __init__(self):
-        self.fetcher = MarketDataFetcher()
+    def __init__(self, fetcher=None, bar_cache=None):
+        """
+        Args:
+            fetcher: Shared MarketDataFetcher whose connection is reused (a private one is made if omitted)
+            bar_cache: Shared BarCache on a connected fetcher; candles are then read through it
+        """
+        self.fetcher = fetcher if fetcher is not None else MarketDataFetcher()
+        self.bar_cache = bar_cache
     
-    def check_higher_timeframe_trend(self, current_time, timeframe_min=60):
+    def check_higher_timeframe_trend(self, current_time, timeframe_min=60, df_higher=None):
         """
         Check if higher timeframe confirms the setup
         
         Args:
             current_time: Time of pattern on lower timeframe
             timeframe_min: Higher timeframe to check (60 = 1 hour, 240 = 4 hour)
+            df_higher: Already-fetched higher timeframe candles (fetched here if omitted)
             
         Returns:
             'uptrend', 'downtrend', or 'neutral'
         """
-        self.fetcher.connect()
-        df_higher = self.fetcher.get_candles(timeframe_minutes=timeframe_min, num_candles=100)
-        self.fetcher.disconnect()
+        if df_higher is None and self.bar_cache is not None:
+            df_higher = self.bar_cache.get_candles(timeframe_minutes=timeframe_min, num_candles=100)
+        elif df_higher is None:
+            # Only open/close the connection if the caller hasn't already
+            owns_connection = not self.fetcher.connected
+            if owns_connection:
+                self.fetcher.connect()
+            df_higher = self.fetcher.get_candles(timeframe_minutes=timeframe_min, num_candles=100)
+            if owns_connection:
+                self.fetcher.disconnect()
         
-        df_higher['ema_20'] = df_higher['close'].ewm(span=20).mean()
-        df_higher['ema_50'] = df_higher['close'].ewm(span=50).mean()
+        closes = df_higher['close'].to_numpy(dtype=np.float64)
+        close = closes[-1]
+        ema_20 = _ema_last(closes, 20)
+        ema_50 = _ema_last(closes, 50)
         
-        latest = df_higher.iloc[-1]
-        
-        if latest['close'] > latest['ema_20'] and latest['ema_20'] > latest['ema_50']:
+        if close > ema_20 and ema_20 > ema_50:
             return 'uptrend'
-        elif latest['close'] < latest['ema_20'] and latest['ema_20'] < latest['ema_50']:
+        elif close < ema_20 and ema_20 < ema_50:
             return 'downtrend'
         else:
             return 'neutral'
+
+
+def _ema_last(closes, span):
+    """Last value of closes.ewm(span=span).mean() (adjusted weights), without building the series"""
+    decay = 1.0 - 2.0 / (span + 1)
+    weights = decay ** np.arange(len(closes) - 1, -1, -1, dtype=np.float64)
+    return weights @ closes / weights.sum()
@@ -1,74 +1,137 @@
 from market_data import MarketDataFetcher
 from pattern_detector import PatternDetector
 from backtest_engine import BacktestEngine
+import io
+import logging
+import numpy as np
+import os
 import pandas as pd
-
-print("Fetching data for optimization...")
-fetcher = MarketDataFetcher()
-fetcher.connect()
-df = fetcher.get_candles(timeframe_minutes=15, num_candles=2000)
-fetcher.disconnect()
+from contextlib import redirect_stdout
+from multiprocessing import Pool
 
 # LOOSENED PARAMETERS: Lower body ratios to catch more patterns
-body_ratios = [1.05, 1.1, 1.2, 1.5] 
+body_ratios = [1.05, 1.1, 1.2, 1.5]
 reward_risks = [1.5, 2.0, 2.5]
 risk_pcts = [1.0, 2.0]
 
-results = []
+# One row per combination in the results array
+RESULT_COLUMNS = ['body_ratio', 'rr_ratio', 'risk_pct', 'total_trades', 'win_rate',
+                  'profit_factor', 'net_profit_pct', 'max_drawdown']
+
+# Candle data, its columns as arrays and the worker's engine, set in each worker by _init_worker
+df = None
+arrays = None
+engine = None
+
+
+def _init_worker(df_shared):
+    """Pool initializer: hand the candle data to a worker process once"""
+    global df, arrays, engine
+    df = df_shared
+    arrays = {
+        'close': df['close'].to_numpy(),
+        'low': df['low'].to_numpy(),
+        'time': df['time'].array,
+    }
+    engine = BacktestEngine(initial_capital=10000, risk_per_trade_pct=1.0)
+
+
+def _evaluate_body_ratio(body_ratio):
+    """
+    Backtest every rr_ratio / risk_pct combination for one body ratio
+
+    Signal detection only depends on body_ratio, so it runs once here
+    instead of once per combination.
+
+    Returns:
+        (captured stdout, RESULT_COLUMNS rows in rr_ratio/risk_pct order)
+    """
+    log = io.StringIO()
+    results = np.empty((len(reward_risks) * len(risk_pcts), len(RESULT_COLUMNS)), dtype=np.float64)
+    n = 0
+    with redirect_stdout(log):
+        detector = PatternDetector(df)
+        # Loosening the S/R proximity internally if possible
+        signals = detector.detect_bullish_engulfing_with_SR(min_body_ratio=body_ratio)
+
+        if len(signals) == 0:
+            return log.getvalue(), results[:0]
+
+        # Entry and stop only depend on the signal; the target only scales with rr_ratio
+        entry_idx = np.array([signal['index'] for signal in signals], dtype=np.int64)
+        entry_prices = arrays['close'][entry_idx]
+        stop_losses = arrays['low'][entry_idx] - 1.5 # Tighter SL for Gold
+        risks = entry_prices - stop_losses
+        entry_times = arrays['time'][entry_idx]
+        is_long = np.ones(len(entry_idx), dtype=bool)
+
+        for rr_ratio in reward_risks:
+            take_profits = entry_prices + (risks * rr_ratio)
+            # Exits don't depend on position size, so one scan serves every risk_pct
+            exit_idx, exit_price, exit_reason = engine.scan_exits(df, entry_idx, stop_losses, take_profits, is_long)
+
+            for risk_pct in risk_pcts:
+                # Reuse the worker's engine so its price-array cache survives across combinations
+                backtest = engine
+                backtest.risk_per_trade_pct = risk_pct
+                backtest.reset()
 
-print("Testing parameter combinations...\n")
-total_combinations = len(body_ratios) * len(reward_risks) * len(risk_pcts)
-current = 0
+                for k in range(len(entry_idx)):
+                    backtest.record_trade('long', entry_prices[k], stop_losses[k], take_profits[k], entry_times[k],
+                                          exit_idx[k], exit_price[k], exit_reason[k], df)
 
-for body_ratio in body_ratios:
-    for rr_ratio in reward_risks:
-        for risk_pct in risk_pcts:
-            current += 1
+                stats = backtest.get_statistics()
+
+                # CHANGED: Minimum 1 trade so the script doesn't crash
+                if stats and stats['total_trades'] >= 1:
+                    results[n] = (body_ratio, rr_ratio, risk_pct, stats['total_trades'], stats['win_rate'],
+                                  stats['profit_factor'], stats['net_profit_pct'], stats['max_drawdown_pct'])
+                    n += 1
+
+    return log.getvalue(), results[:n]
+
+
+def main():
+    # PatternDetector's status lines go through logging; show them like the prints around them
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    print("Fetching data for optimization...")
+    fetcher = MarketDataFetcher()
+    fetcher.connect()
+    df = fetcher.get_candles(timeframe_minutes=15, num_candles=2000)
+    fetcher.disconnect()
+
+    print("Testing parameter combinations...\n")
+    total_combinations = len(body_ratios) * len(reward_risks) * len(risk_pcts)
+    current = 0
+
+    # Filled row by row; combinations without trades are skipped, so only results[:n] is valid
+    results = np.empty((total_combinations, len(RESULT_COLUMNS)), dtype=np.float64)
+    n = 0
+
+    # One task per body ratio; results come back in body_ratios order
+    with Pool(min(os.cpu_count() or 1, len(body_ratios)), initializer=_init_worker,
+              initargs=(df,)) as pool:
+        for log, ratio_results in pool.imap(_evaluate_body_ratio, body_ratios):
+            print(log, end='')
+            current += len(reward_risks) * len(risk_pcts)
             print(f"Testing combination {current}/{total_combinations}...", end='\r')
-            
-            detector = PatternDetector(df)
-            # Loosening the S/R proximity internally if possible
-            signals = detector.detect_bullish_engulfing_with_SR(min_body_ratio=body_ratio)
-            
-            if len(signals) == 0:
-                continue
-            
-            backtest = BacktestEngine(initial_capital=10000, risk_per_trade_pct=risk_pct)
-            
-            for signal in signals:
-                idx = signal['index']
-                entry_candle = df.iloc[idx]
-                
-                entry_price = entry_candle['close']
-                stop_loss = entry_candle['low'] - 1.5 # Tighter SL for Gold
-                risk = entry_price - stop_loss
-                take_profit = entry_price + (risk * rr_ratio)
-                
-                backtest.simulate_trade('long', entry_price, stop_loss, take_profit, entry_candle['time'], df)
-            
-            stats = backtest.get_statistics()
-            
-            # CHANGED: Minimum 1 trade so the script doesn't crash
-            if stats and stats['total_trades'] >= 1:
-                results.append({
-                    'body_ratio': body_ratio,
-                    'rr_ratio': rr_ratio,
-                    'risk_pct': risk_pct,
-                    'total_trades': stats['total_trades'],
-                    'win_rate': stats['win_rate'],
-                    'profit_factor': stats['profit_factor'],
-                    'net_profit_pct': stats['net_profit_pct'],
-                    'max_drawdown': stats['max_drawdown_pct']
-                })
-
-print("\n\nOptimization complete!")
-
-if not results:
-    print("❌ No trades found even with loosened parameters. Check your S/R logic in pattern_detector.py")
-else:
-    results_df = pd.DataFrame(results)
-    # Handle cases where profit_factor might be 'inf' or NaN
-    results_df = results_df.sort_values('net_profit_pct', ascending=False)
-    print("\nTop Parameter Combinations (Sorted by Net Profit):")
-    print(results_df.head(10).to_string(index=False))
-    results_df.to_csv('logs/optimization_results.csv', index=False)
\ No newline at end of file
+            results[n:n + len(ratio_results)] = ratio_results
+            n += len(ratio_results)
+
+    print("\n\nOptimization complete!")
+
+    if n == 0:
+        print("❌ No trades found even with loosened parameters. Check your S/R logic in pattern_detector.py")
+    else:
+        results_df = pd.DataFrame(results[:n], columns=RESULT_COLUMNS)
+        results_df['total_trades'] = results_df['total_trades'].astype(int)
+        # Handle cases where profit_factor might be 'inf' or NaN
+        results_df = results_df.sort_values('net_profit_pct', ascending=False)
+        print("\nTop Parameter Combinations (Sorted by Net Profit):")
+        print(results_df.head(10).to_string(index=False))
+        results_df.to_csv('logs/optimization_results.csv', index=False)
+
+
+if __name__ == '__main__':
+    main()
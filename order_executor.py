@@ -1,5 +1,8 @@
+import logging
 import MetaTrader5 as mt5
 
+logger = logging.getLogger(__name__)
+
 class OrderExecutor:
     """Executes trades via MT5"""
     
@@ -12,26 +15,38 @@ class OrderExecutor:
         self.symbol = symbol
         self.magic_number = magic_number
         self.connected = False
+        # Order fields that never change between trades, built in connect()
+        self._request_template = None
     
     def connect(self):
         """Initialize MT5"""
         if not mt5.initialize():
-            print("ERROR: MT5 init failed")
+            logger.error("MT5 init failed")
             return False
         
         if not mt5.symbol_select(self.symbol, True):
-            print(f"ERROR: Failed to select {self.symbol}")
+            logger.error("Failed to select %s", self.symbol)
             return False
         
+        self._request_template = {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": self.symbol,
+            "deviation": 10,
+            "magic": self.magic_number,
+            "comment": "Pattern Bot",
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": mt5.ORDER_FILLING_IOC,
+        }
+        
         self.connected = True
-        print(f"✓ Order executor connected to {self.symbol}")
+        logger.info("✓ Order executor connected to %s", self.symbol)
         return True
     
     def disconnect(self):
         """Close MT5"""
         mt5.shutdown()
         self.connected = False
-        print("✓ Order executor disconnected")
+        logger.info("✓ Order executor disconnected")
     
     def execute_trade(self, direction, entry_price, stop_loss, take_profit, lot_size=0.01):
         """
@@ -48,41 +63,29 @@ class OrderExecutor:
             Order result
         """
         if not self.connected:
-            print("ERROR: Not connected")
+            logger.error("Not connected")
             return None
         
-        symbol_info = mt5.symbol_info(self.symbol)
+        # Only bid/ask are needed, so skip the full symbol_info round-trip
+        tick = mt5.symbol_info_tick(self.symbol)
         
         if direction == 'long':
             order_type = mt5.ORDER_TYPE_BUY
-            price = symbol_info.ask
+            price = tick.ask
         else:
             order_type = mt5.ORDER_TYPE_SELL
-            price = symbol_info.bid
+            price = tick.bid
         
-        request = {
-            "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": self.symbol,
-            "volume": lot_size,
-            "type": order_type,
-            "price": price,
-            "sl": stop_loss,
-            "tp": take_profit,
-            "deviation": 10,
-            "magic": self.magic_number,
-            "comment": "Pattern Bot",
-            "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
+        request = self._request_template.copy()
+        request.update(volume=lot_size, type=order_type, price=price, sl=stop_loss, tp=take_profit)
         
         result = mt5.order_send(request)
         
         if result.retcode != mt5.TRADE_RETCODE_DONE:
-            print(f"ERROR: Order failed - {result.comment}")
+            logger.error("Order failed - %s", result.comment)
             return None
         
-        print(f"✓ Order executed: {direction.upper()} {lot_size} lots at {price:.2f}")
-        print(f"  SL: {stop_loss:.2f} | TP: {take_profit:.2f}")
-        print(f"  Order ticket: {result.order}")
+        logger.info("✓ Order executed: %s %s lots at %.2f\n  SL: %.2f | TP: %.2f\n  Order ticket: %s",
+                    direction.upper(), lot_size, price, stop_loss, take_profit, result.order)
         
         return result
@@ -1,6 +1,485 @@
+import logging
 import pandas as pd
 import numpy as np
 import pandas_ta_classic as ta
+from numpy.lib.stride_tricks import sliding_window_view
+from _njit import HAVE_NUMBA, njit, prange
+from indicator_cache import (INDICATOR_COLUMNS, STATE_COLUMNS, VOLUME_MA_LENGTH, average_true_range,
+                             compute_emas, extend_indicators, rsi_averages, volume_moving_average)
+
+try:
+    import talib
+except ImportError:
+    # TA-Lib is optional; pandas_ta_classic computes the same indicators, just slower
+    talib = None
+
+try:
+    from support_resistance import SupportResistanceDetector
+except ImportError:
+    SupportResistanceDetector = None
+
+logger = logging.getLogger(__name__)
+
+
+@njit(cache=True)
+def _engulf_scan(opens, closes, bodies, min_body_ratio, bullish):
+    """
+    Indices of candles that engulf the previous one, in a single pass
+    
+    bodies is abs(close - open) per candle, precomputed by the caller.
+    min_body_ratio and bullish stay runtime arguments: baking them into a
+    per-ratio compiled closure measured no faster (the loop is bound by
+    loading the arrays) and costs a fresh compile for every ratio.
+    
+    Returns:
+        int64 array of signal indices (ascending)
+    """
+    n = len(opens)
+    out = np.empty(n, dtype=np.int64)
+    k = 0
+    
+    # All six tests are packed into one bitmask with no early exits: whether a
+    # candle engulfs is close to random, so branching on each test mispredicts
+    for i in range(1, n):
+        prev_open = opens[i-1]
+        prev_close = closes[i-1]
+        curr_open = opens[i]
+        curr_close = closes[i]
+        prev_body = bodies[i-1]
+        
+        if bullish:
+            # Red candle, then a green one opening at/below its close and closing at/above its open
+            flags = ((prev_close < prev_open) |
+                     ((curr_close > curr_open) << 1) |
+                     ((curr_open <= prev_close) << 2) |
+                     ((curr_close >= prev_open) << 3))
+        else:
+            # Green candle, then a red one opening at/above its close and closing at/below its open
+            flags = ((prev_close > prev_open) |
+                     ((curr_close < curr_open) << 1) |
+                     ((curr_open >= prev_close) << 2) |
+                     ((curr_close <= prev_open) << 3))
+        flags |= ((prev_body > 0) << 4) | ((bodies[i] > prev_body * min_body_ratio) << 5)
+        
+        # Always write the slot; it is only kept (k advanced) when every test passed
+        out[k] = i
+        k += flags == 0b111111
+    
+    return out[:k]
+
+
+def _engulf_scan_vectorized(opens, closes, bodies, min_body_ratio, bullish):
+    """_engulf_scan as shifted-array masks (previous candle = [:-1], current = [1:])"""
+    prev_open, prev_close, prev_body = opens[:-1], closes[:-1], bodies[:-1]
+    curr_open, curr_close = opens[1:], closes[1:]
+    
+    if bullish:
+        mask = ((prev_close < prev_open) & (curr_close > curr_open) &
+                (curr_open <= prev_close) & (curr_close >= prev_open))
+    else:
+        mask = ((prev_close > prev_open) & (curr_close < curr_open) &
+                (curr_open >= prev_close) & (curr_close <= prev_open))
+    mask &= (prev_body > 0) & (bodies[1:] > prev_body * min_body_ratio)
+    
+    return (np.flatnonzero(mask) + 1).astype(np.int64)
+
+
+if not HAVE_NUMBA:
+    # Uncompiled, the kernel is a per-candle Python loop; numpy masks are far faster there
+    _engulf_scan = _engulf_scan_vectorized
+
+
+@njit(cache=True)
+def _engulf_masks_both(opens, closes, bodies, min_body_ratio):
+    """
+    _engulf_scan for both directions in one pass over the candles
+    
+    Returns:
+        (bullish mask, bearish mask) as boolean arrays
+    """
+    n = len(opens)
+    bullish = np.zeros(n, dtype=np.bool_)
+    bearish = np.zeros(n, dtype=np.bool_)
+    
+    for i in range(1, n):
+        prev_open = opens[i-1]
+        prev_close = closes[i-1]
+        curr_open = opens[i]
+        curr_close = closes[i]
+        prev_body = bodies[i-1]
+        
+        # The body test is the same for both directions
+        big = (prev_body > 0) & (bodies[i] > prev_body * min_body_ratio)
+        bullish[i] = big & (prev_close < prev_open) & (curr_close > curr_open) & \
+                     (curr_open <= prev_close) & (curr_close >= prev_open)
+        bearish[i] = big & (prev_close > prev_open) & (curr_close < curr_open) & \
+                     (curr_open >= prev_close) & (curr_close <= prev_open)
+    
+    return bullish, bearish
+
+
+def _engulf_masks_both_vectorized(opens, closes, bodies, min_body_ratio):
+    """_engulf_masks_both from the shifted-array masks of _engulf_scan_vectorized"""
+    masks = []
+    for bullish in (True, False):
+        mask = np.zeros(len(opens), dtype=bool)
+        mask[_engulf_scan_vectorized(opens, closes, bodies, min_body_ratio, bullish)] = True
+        masks.append(mask)
+    return masks[0], masks[1]
+
+
+if not HAVE_NUMBA:
+    _engulf_masks_both = _engulf_masks_both_vectorized
+
+
+@njit(cache=True, parallel=True)
+def _engulf_mask_rows(opens, closes, min_body_ratio, bullish):
+    """Engulfing mask per row of (n_symbols, n_bars) arrays, rows scanned in parallel"""
+    n_symbols, n_bars = opens.shape
+    mask = np.zeros((n_symbols, n_bars), dtype=np.bool_)
+    
+    for s in prange(n_symbols):
+        bodies = np.abs(closes[s] - opens[s])
+        signals = _engulf_scan(opens[s], closes[s], bodies, min_body_ratio, bullish)
+        for k in range(len(signals)):
+            mask[s, signals[k]] = True
+    
+    return mask
+
+
+def scan_engulfing_symbols(opens, closes, min_body_ratio=1.5, bullish=True):
+    """
+    Engulfing scan over several symbols at once
+    
+    Same test as PatternDetector.detect_bullish/bearish_engulfing, without
+    building a detector per symbol. Each symbol's bars must be aligned to
+    the same length; symbols are spread over the CPU cores.
+    
+    Args:
+        opens, closes: Arrays of shape (n_symbols, n_bars)
+        min_body_ratio: Current candle body must be this times larger than previous
+        bullish: True for bullish engulfing, False for bearish
+        
+    Returns:
+        Boolean array of shape (n_symbols, n_bars), True on signal candles
+    """
+    opens = np.ascontiguousarray(opens, dtype=np.float64)
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    return _engulf_mask_rows(opens, closes, float(min_body_ratio), bool(bullish))
+
+
+@njit(cache=True)
+def _linfit(x, y):
+    """
+    Least-squares line through (x, y), i.e. np.polyfit(x, y, 1) without
+    the Vandermonde matrix and LAPACK call
+    
+    Returns:
+        (slope, intercept)
+    """
+    n = len(x)
+    x_mean = x.sum() / n
+    y_mean = y.sum() / n
+    sxy = 0.0
+    sxx = 0.0
+    for k in range(n):
+        dx = x[k] - x_mean
+        sxy += dx * (y[k] - y_mean)
+        sxx += dx * dx
+    slope = sxy / sxx
+    return slope, y_mean - slope * x_mean
+
+
+@njit(cache=True)
+def _window_points(points, prices, start, first, stop, xs, ys):
+    """
+    The sorted candle positions in points that fall in [first, stop), as
+    positions relative to start (into xs) and prices (into ys)
+    
+    Returns:
+        How many were found
+    """
+    lo = np.searchsorted(points, first)
+    hi = np.searchsorted(points, stop)
+    for m in range(hi - lo):
+        g = points[lo + m]
+        xs[m] = g - start
+        ys[m] = prices[g]
+    return hi - lo
+
+
+@njit(cache=True)
+def _last_points(points, first, last, count):
+    """
+    The last `count` of the sorted candle positions in points that fall in [first, last]
+    
+    Returns:
+        Index into points of the oldest of them, or -1 if there are fewer than count
+    """
+    end = np.searchsorted(points, last, side='right')
+    if end < count or points[end - count] < first:
+        return -1
+    return end - count
+
+
+@njit(cache=True)
+def _scan_triangle(high, low, close, swing_highs, swing_lows, lookback, tolerance, ascending):
+    """
+    Ascending triangle (flat swing highs, rising swing lows, close above the
+    highs) or descending triangle (flat lows, falling highs, close below)
+    
+    Returns:
+        (signal indices, level of the flat side)
+    """
+    n = len(close)
+    out = np.empty(n, dtype=np.int64)
+    levels = np.empty(n)
+    k = 0
+    size = max(lookback, 0)
+    high_x, high_y = np.empty(size), np.empty(size)
+    low_x, low_y = np.empty(size), np.empty(size)
+    
+    for i in range(lookback, n):
+        start = i - lookback
+        nh = _window_points(swing_highs, high, start, start + 1, i - 1, high_x, high_y)
+        nl = _window_points(swing_lows, low, start, start + 1, i - 1, low_x, low_y)
+        if nh < 2 or nl < 2:
+            continue
+        
+        if ascending:
+            flat, slope_x, slope_y = high_y[:nh], low_x[:nl], low_y[:nl]
+        else:
+            flat, slope_x, slope_y = low_y[:nl], high_x[:nh], high_y[:nh]
+        
+        level = flat.mean()
+        horizontal = True
+        for v in flat:
+            if not abs(v - level) / level < tolerance:
+                horizontal = False
+                break
+        if not horizontal:
+            continue
+        
+        slope, _ = _linfit(slope_x, slope_y)
+        if ascending:
+            breakout = slope > 0 and close[i] > level
+        else:
+            breakout = slope < 0 and close[i] < level
+        if breakout:
+            out[k] = i
+            levels[k] = level
+            k += 1
+    
+    return out[:k], levels[:k]
+
+
+@njit(cache=True)
+def _scan_converging(high, low, close, swing_highs, swing_lows, lookback, first, stop, kind):
+    """
+    Trend lines through the window's swing highs and lows, tested for
+    kind 0 (symmetrical triangle), 1 (rising wedge) or 2 (falling wedge)
+    at candles first..stop-1
+    
+    Returns:
+        (signal indices, direction: 1 bullish / -1 bearish)
+    """
+    n = len(close)
+    stop = min(stop, n)
+    out = np.empty(max(stop - first, 0), dtype=np.int64)
+    directions = np.empty(max(stop - first, 0), dtype=np.int64)
+    k = 0
+    size = max(lookback, 0)
+    high_x, high_y = np.empty(size), np.empty(size)
+    low_x, low_y = np.empty(size), np.empty(size)
+    
+    for i in range(max(first, lookback), stop):
+        start = i - lookback
+        nh = _window_points(swing_highs, high, start, start + 1, i - 1, high_x, high_y)
+        nl = _window_points(swing_lows, low, start, start + 1, i - 1, low_x, low_y)
+        if nh < 2 or nl < 2:
+            continue
+        
+        resistance_slope, resistance_intercept = _linfit(high_x[:nh], high_y[:nh])
+        support_slope, support_intercept = _linfit(low_x[:nl], low_y[:nl])
+        # Both lines projected to the window's last candle
+        resistance_at_current = resistance_slope * (lookback - 1) + resistance_intercept
+        support_at_current = support_slope * (lookback - 1) + support_intercept
+        
+        direction = 0
+        if kind == 0:
+            if resistance_slope < 0 and support_slope > 0:
+                if close[i] > resistance_at_current:
+                    direction = 1
+                elif close[i] < support_at_current:
+                    direction = -1
+        elif kind == 1:
+            if resistance_slope > 0 and support_slope > 0 and support_slope > resistance_slope:
+                if close[i] < support_at_current:
+                    direction = -1
+        else:
+            if resistance_slope < 0 and support_slope < 0 and resistance_slope < support_slope:
+                if close[i] > resistance_at_current:
+                    direction = 1
+        
+        if direction != 0:
+            out[k] = i
+            directions[k] = direction
+            k += 1
+    
+    return out[:k], directions[:k]
+
+
+@njit(cache=True)
+def _scan_double(high, low, close, extremes, lookback, tolerance, top):
+    """
+    Double top (top=True: the window's last two peaks within tolerance, close
+    below the lowest low between them) or double bottom (mirror image)
+    
+    Returns:
+        (signal indices, average of the two extremes, neckline)
+    """
+    n = len(close)
+    out = np.empty(n, dtype=np.int64)
+    levels = np.empty(n)
+    necklines = np.empty(n)
+    k = 0
+    
+    for i in range(lookback, n):
+        # Peaks/troughs need two window candles on each side
+        p = _last_points(extremes, i - lookback + 2, i - 3, 2)
+        if p < 0:
+            continue
+        first, second = extremes[p], extremes[p + 1]
+        
+        if top:
+            price1, price2 = high[first], high[second]
+        else:
+            price1, price2 = low[first], low[second]
+        if not abs(price1 - price2) / price1 < tolerance:
+            continue
+        
+        if top:
+            neckline = low[first:second].min()
+            breakout = close[i] < neckline
+        else:
+            neckline = high[first:second].max()
+            breakout = close[i] > neckline
+        if breakout:
+            out[k] = i
+            levels[k] = (price1 + price2) / 2
+            necklines[k] = neckline
+            k += 1
+    
+    return out[:k], levels[:k], necklines[:k]
+
+
+@njit(cache=True)
+def _scan_head_shoulders(high, low, close, extremes, lookback, tolerance, top):
+    """
+    Head and shoulders (top=True: last three peaks, middle highest, shoulders
+    within tolerance, close below the neckline) or the inverse pattern
+    
+    Returns:
+        (signal indices, head price, average shoulder price, neckline)
+    """
+    n = len(close)
+    out = np.empty(n, dtype=np.int64)
+    heads = np.empty(n)
+    shoulders = np.empty(n)
+    necklines = np.empty(n)
+    k = 0
+    
+    for i in range(lookback, n):
+        p = _last_points(extremes, i - lookback + 2, i - 3, 3)
+        if p < 0:
+            continue
+        left_idx, head_idx, right_idx = extremes[p], extremes[p + 1], extremes[p + 2]
+        
+        prices = high if top else low
+        left_shoulder, head, right_shoulder = prices[left_idx], prices[head_idx], prices[right_idx]
+        if top:
+            if not (head > left_shoulder and head > right_shoulder):
+                continue
+        elif not (head < left_shoulder and head < right_shoulder):
+            continue
+        if not abs(left_shoulder - right_shoulder) / left_shoulder < tolerance:
+            continue
+        
+        # Neckline through the lows (highs) between the peaks (troughs)
+        if top:
+            neckline = (low[left_idx:head_idx].min() + low[head_idx:right_idx].min()) / 2
+            breakout = close[i] < neckline
+        else:
+            neckline = (high[left_idx:head_idx].max() + high[head_idx:right_idx].max()) / 2
+            breakout = close[i] > neckline
+        if breakout:
+            out[k] = i
+            heads[k] = head
+            shoulders[k] = (left_shoulder + right_shoulder) / 2
+            necklines[k] = neckline
+            k += 1
+    
+    return out[:k], heads[:k], shoulders[:k], necklines[:k]
+
+
+def _rolling_extreme(values, size, highest):
+    """
+    Max (highest=True) or min of every size-long window of values, entry s
+    covering values[s:s+size]; one shifted np.maximum/np.minimum per offset
+    """
+    count = len(values) - size + 1
+    out = values[:count].copy()
+    extreme = np.maximum if highest else np.minimum
+    for j in range(1, size):
+        extreme(out, values[j:j+count], out=out)
+    return out
+
+
+@njit(cache=True)
+def _rounded_fits(values, lookback, upward, starts):
+    """
+    R^2 of a quadratic least-squares fit to the lookback-long window of
+    values at each of starts (entry k covers values[starts[k]:starts[k]+lookback]),
+    or 0 where the parabola bends the wrong way (upward=True wants a U,
+    False an inverted U)
+    
+    The fit is done in a basis of polynomials that are orthogonal over the
+    window's evenly spaced x (1, x - mid, (x - mid)^2 - mean), so each
+    coefficient is one dot product and the leading one equals polyfit's.
+    Serial on purpose: the fits are tiny, and starting numba's thread pool
+    here hangs scripts that fork worker processes afterwards (e.g.
+    comprehensive_backtest). Needs lookback >= 3.
+    """
+    fits = np.zeros(len(starts))
+    if lookback < 3:
+        return fits
+    
+    p1 = np.arange(lookback) - (lookback - 1) / 2.0
+    p2 = p1 * p1
+    p2 -= p2.mean()
+    p1_norm = (p1 * p1).sum()
+    p2_norm = (p2 * p2).sum()
+    
+    for k in range(len(starts)):
+        y = values[starts[k]:starts[k]+lookback]
+        y_mean = y.mean()
+        
+        # Leading coefficient first: a wrong-way curve needs no R^2
+        curvature = (p2 * y).sum() / p2_norm
+        if not (curvature > 0 if upward else curvature < 0):
+            continue
+        slope = (p1 * y).sum() / p1_norm
+        
+        ss_res = 0.0
+        ss_tot = 0.0
+        for j in range(lookback):
+            residual = y[j] - (y_mean + slope * p1[j] + curvature * p2[j])
+            ss_res += residual * residual
+            ss_tot += (y[j] - y_mean) * (y[j] - y_mean)
+        fits[k] = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
+    
+    return fits
+
 
 class PatternDetector:
     """
@@ -8,38 +487,157 @@ class PatternDetector:
     Implements 11 major chart patterns from forex.com
     """
     
-    def __init__(self, df):
+    def __init__(self, df, inplace=False):
         """
         Args:
             df: DataFrame with columns: time, open, high, low, close, volume
+            inplace: Add the indicator columns to df itself instead of a new frame
         """
-        self.df = df.copy()
-        self.df.reset_index(drop=True, inplace=True)
+        if inplace:
+            self.df = df
+            index = df.index
+            # Only rebuild the index when it isn't already 0..n-1
+            if not (isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1):
+                self.df.reset_index(drop=True, inplace=True)
+        else:
+            # New frame over the same column arrays (no data copy); the detector only
+            # adds columns, so the caller's df is left as it was
+            self.df = pd.DataFrame({col: df[col].array for col in df.columns}, copy=False)
+        # Engulfing masks per (bullish, min_body_ratio), shared by the raw/filtered/S/R variants
+        self._engulfing_masks = {}
+        # S/R detector over the latest candles, built on first use by the *_with_SR methods
+        self._sr = None
+        self._sr_len = 0
+        # Wilder RSI averages, seeded from the history by the first append_bar
+        self._rsi_state = None
         self._calculate_indicators()
         
     def _calculate_indicators(self):
         """Calculate technical indicators needed for pattern detection"""
-        # RSI for overbought/oversold conditions
-        self.df['rsi'] = ta.rsi(self.df['close'], length=14)
+        # Frames from IndicatorCache (live scanner) already carry these
+        has_indicators = all(col in self.df.columns for col in INDICATOR_COLUMNS)
+        
+        if not has_indicators:
+            # TA-Lib's C versions when available; same definitions as pandas_ta
+            close = self.df['close'].to_numpy(dtype=np.float64)
+            
+            # RSI for overbought/oversold conditions
+            if talib is not None:
+                self.df['rsi'] = talib.RSI(close, timeperiod=14)
+            else:
+                self.df['rsi'] = ta.rsi(self.df['close'], length=14)
+            
+            # EMAs for trend context (20/50/200 in one pass over close)
+            for col, values in compute_emas(close).items():
+                self.df[col] = values
+            
+            # ATR for volatility measurement
+            self.df['atr'] = average_true_range(self.df['high'].to_numpy(), self.df['low'].to_numpy(), close)
+            
+            # Volume indicators (running-sum moving average)
+            volume_ma = volume_moving_average(self.df['volume'].to_numpy())
+            self.df['volume_ma'] = volume_ma
+            self.df['volume_ratio'] = self.df['volume'].to_numpy(dtype=np.float64) / volume_ma
         
-        # EMAs for trend context
-        self.df['ema_20'] = ta.ema(self.df['close'], length=20)
-        self.df['ema_50'] = ta.ema(self.df['close'], length=50)
-        self.df['ema_200'] = ta.ema(self.df['close'], length=200)
+        self._bind_arrays()
         
-        # ATR for volatility measurement
-        self.df['atr'] = ta.atr(self.df['high'], self.df['low'], self.df['close'], length=14)
+        # Candle body and wick calculations (body sizes are computed once and reused by every detector)
+        self._body = np.abs(self._close - self._open)
+        self._is_green = self._close > self._open
+        self.df['body'] = self._body
+        self.df['upper_wick'] = self._high - np.maximum(self._open, self._close)
+        self.df['lower_wick'] = np.minimum(self._open, self._close) - self._low
         
-        # Volume indicators
-        self.df['volume_ma'] = self.df['volume'].rolling(window=20).mean()
-        self.df['volume_ratio'] = self.df['volume'] / self.df['volume_ma']
+        logger.info("✓ Technical indicators calculated successfully")
+    
+    def _bind_arrays(self):
+        """Column arrays for the detectors' per-candle loops; self.df stays the user-facing frame"""
+        self._open = self.df['open'].to_numpy(dtype=np.float64)
+        self._high = self.df['high'].to_numpy(dtype=np.float64)
+        self._low = self.df['low'].to_numpy(dtype=np.float64)
+        self._close = self.df['close'].to_numpy(dtype=np.float64)
+        self._volume = self.df['volume'].to_numpy()
+        self._rsi = self.df['rsi'].to_numpy(dtype=np.float64)
+        self._ema_50 = self.df['ema_50'].to_numpy(dtype=np.float64)
+        self._volume_ratio = self.df['volume_ratio'].to_numpy(dtype=np.float64)
+        
+        # Candles above (below) both neighbours, found once for the whole series and shared as
+        # sorted positions by the triangle and wedge scans (each window binary-searches its own)
+        is_swing_high = np.zeros(len(self._high), dtype=bool)
+        is_swing_high[1:-1] = (self._high[1:-1] > self._high[:-2]) & (self._high[1:-1] > self._high[2:])
+        is_swing_low = np.zeros(len(self._low), dtype=bool)
+        is_swing_low[1:-1] = (self._low[1:-1] < self._low[:-2]) & (self._low[1:-1] < self._low[2:])
+        self._swing_highs = np.flatnonzero(is_swing_high)
+        self._swing_lows = np.flatnonzero(is_swing_low)
+        # Positions of the stricter two-candles-each-side peaks/troughs, for double tops and
+        # head and shoulders (the scans binary-search them per window)
+        self._peaks = np.flatnonzero(is_swing_high[2:-2] & (self._high[2:-2] > self._high[:-4]) &
+                                     (self._high[2:-2] > self._high[4:])) + 2
+        self._troughs = np.flatnonzero(is_swing_low[2:-2] & (self._low[2:-2] < self._low[:-4]) &
+                                       (self._low[2:-2] < self._low[4:])) + 2
+        # Staircase swing points: candles at or beyond both neighbours (ties count)
+        self._step_highs = np.flatnonzero((self._high[1:-1] >= self._high[:-2]) &
+                                          (self._high[1:-1] >= self._high[2:])) + 1
+        self._step_lows = np.flatnonzero((self._low[1:-1] <= self._low[:-2]) &
+                                         (self._low[1:-1] <= self._low[2:])) + 1
+    
+    def append_bar(self, time, open_, high, low, close, volume):
+        """
+        Add the next candle without recomputing the whole history
         
-        # Candle body and wick calculations
-        self.df['body'] = abs(self.df['close'] - self.df['open'])
-        self.df['upper_wick'] = self.df['high'] - self.df[['open', 'close']].max(axis=1)
-        self.df['lower_wick'] = self.df[['open', 'close']].min(axis=1) - self.df['low']
+        Indicators are carried forward one bar with IndicatorCache's
+        recurrences and the cached engulfing masks only check the new
+        candle. self.df is replaced by a new frame with the extra row.
         
-        print("✓ Technical indicators calculated successfully")
+        Returns:
+            Index of the new candle
+        """
+        i = len(self.df)
+        bar = {'time': time, 'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+        
+        if self._rsi_state is None and i > 0:
+            self._rsi_state = rsi_averages(self._close)
+        seeded = i > 0 and not any(np.isnan(self.df[col].iat[i-1]) for col in INDICATOR_COLUMNS) and \
+            not any(np.isnan(self._rsi_state[col][i-1]) for col in STATE_COLUMNS)
+        
+        if not seeded:
+            # Indicators still warming up: nothing to carry forward, so recompute them all
+            new_row = pd.DataFrame({col: pd.array([value], dtype=self.df[col].dtype) for col, value in bar.items()})
+            self.df = pd.concat([self.df.drop(columns=list(INDICATOR_COLUMNS)), new_row], ignore_index=True)
+            self._engulfing_masks = {}
+            self._rsi_state = None
+            self._calculate_indicators()
+            return i
+        
+        # The recurrences only look back one bar, plus VOLUME_MA_LENGTH bars for the volume MA
+        start = max(0, i - VOLUME_MA_LENGTH)
+        high_w = np.append(self._high[start:], high)
+        low_w = np.append(self._low[start:], low)
+        close_w = np.append(self._close[start:], close)
+        volume_w = np.append(self._volume[start:].astype(np.float64), volume)
+        columns = {col: np.append(self.df[col].to_numpy(dtype=np.float64)[start:], np.nan) for col in INDICATOR_COLUMNS}
+        columns.update({col: np.append(self._rsi_state[col][start:], np.nan) for col in STATE_COLUMNS})
+        extend_indicators(high_w, low_w, close_w, volume_w, columns, len(close_w) - 1)
+        
+        for col in INDICATOR_COLUMNS:
+            bar[col] = columns[col][-1]
+        bar['body'] = abs(close - open_)
+        bar['upper_wick'] = high - max(open_, close)
+        bar['lower_wick'] = min(open_, close) - low
+        
+        new_row = pd.DataFrame({col: pd.array([value], dtype=self.df[col].dtype) for col, value in bar.items()})
+        self.df = pd.concat([self.df, new_row], ignore_index=True)
+        self._rsi_state = {col: np.append(self._rsi_state[col], columns[col][-1]) for col in STATE_COLUMNS}
+        self._bind_arrays()
+        self._body = self.df['body'].to_numpy(dtype=np.float64)
+        self._is_green = self._close > self._open
+        
+        # Only the new candle (against the one before it) can extend the engulfing masks
+        for (bullish, ratio), mask in self._engulfing_masks.items():
+            found = len(_engulf_scan(self._open[i-1:], self._close[i-1:], self._body[i-1:], ratio, bullish)) > 0
+            self._engulfing_masks[(bullish, ratio)] = np.append(mask, found)
+        
+        return i
         
     # ==================== ENGULFING PATTERNS ====================
     
@@ -53,59 +651,38 @@ class PatternDetector:
         Returns:
             List of indices where pattern detected
         """
-        signals = []
-        
-        for i in range(1, len(self.df)):
-            prev = self.df.iloc[i-1]
-            curr = self.df.iloc[i]
-            
-            prev_body = abs(prev['close'] - prev['open'])
-            curr_body = abs(curr['close'] - curr['open'])
-            
-            # Pattern conditions
-            prev_is_red = prev['close'] < prev['open']
-            curr_is_green = curr['close'] > curr['open']
-            curr_open_below_prev_close = curr['open'] <= prev['close']
-            curr_close_above_prev_open = curr['close'] >= prev['open']
-            body_ratio_ok = curr_body > (prev_body * min_body_ratio) if prev_body > 0 else False
-            
-            if (prev_is_red and 
-                curr_is_green and 
-                curr_open_below_prev_close and 
-                curr_close_above_prev_open and
-                body_ratio_ok):
-                signals.append(i)
-        
-        return signals
+        return np.flatnonzero(self._engulfing_mask(min_body_ratio, bullish=True)).tolist()
     
     def detect_bearish_engulfing(self, min_body_ratio=1.5):
         """
         Detect bearish engulfing patterns
         """
-        signals = []
-        
-        for i in range(1, len(self.df)):
-            prev = self.df.iloc[i-1]
-            curr = self.df.iloc[i]
-            
-            prev_body = abs(prev['close'] - prev['open'])
-            curr_body = abs(curr['close'] - curr['open'])
-            
-            # Pattern conditions
-            prev_is_green = prev['close'] > prev['open']
-            curr_is_red = curr['close'] < curr['open']
-            curr_open_above_prev_close = curr['open'] >= prev['close']
-            curr_close_below_prev_open = curr['close'] <= prev['open']
-            body_ratio_ok = curr_body > (prev_body * min_body_ratio) if prev_body > 0 else False
-            
-            if (prev_is_green and 
-                curr_is_red and 
-                curr_open_above_prev_close and 
-                curr_close_below_prev_open and
-                body_ratio_ok):
-                signals.append(i)
+        return np.flatnonzero(self._engulfing_mask(min_body_ratio, bullish=False)).tolist()
+    
+    def detect_engulfing_both(self, min_body_ratio=1.5):
+        """
+        detect_bullish_engulfing and detect_bearish_engulfing together, from a
+        single pass over the candles (both masks are cached for later calls)
         
-        return signals
+        Returns:
+            (bullish indices, bearish indices) as lists
+        """
+        ratio = float(min_body_ratio)
+        if (True, ratio) not in self._engulfing_masks or (False, ratio) not in self._engulfing_masks:
+            bullish, bearish = _engulf_masks_both(self._open, self._close, self._body, ratio)
+            self._engulfing_masks[(True, ratio)] = bullish
+            self._engulfing_masks[(False, ratio)] = bearish
+        return (np.flatnonzero(self._engulfing_masks[(True, ratio)]).tolist(),
+                np.flatnonzero(self._engulfing_masks[(False, ratio)]).tolist())
+    
+    def _engulfing_mask(self, min_body_ratio, bullish):
+        """Boolean mask of engulfing candles, scanned once per direction and body ratio"""
+        key = (bullish, float(min_body_ratio))
+        if key not in self._engulfing_masks:
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[_engulf_scan(self._open, self._close, self._body, key[1], bullish)] = True
+            self._engulfing_masks[key] = mask
+        return self._engulfing_masks[key]
     
     # ==================== TRIANGLE PATTERNS ====================
     
@@ -120,49 +697,18 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find swing highs and lows
-            highs = []
-            lows = []
-            
-            for j in range(1, len(window)-1):
-                if (window.iloc[j]['high'] > window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j+1]['high']):
-                    highs.append((j, window.iloc[j]['high']))
-                    
-                if (window.iloc[j]['low'] < window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j+1]['low']):
-                    lows.append((j, window.iloc[j]['low']))
-            
-            if len(highs) >= 2 and len(lows) >= 2:
-                # Check for horizontal resistance
-                high_prices = [h[1] for h in highs]
-                resistance_level = np.mean(high_prices)
-                horizontal_resistance = all(abs(h - resistance_level) / resistance_level < tolerance for h in high_prices)
-                
-                # Check for ascending support
-                low_indices = [l[0] for l in lows]
-                low_prices = [l[1] for l in lows]
-                
-                if len(low_prices) >= 2:
-                    # Linear regression for support line
-                    slope, _ = np.polyfit(low_indices, low_prices, 1)
-                    ascending_support = slope > 0
-                    
-                    if horizontal_resistance and ascending_support:
-                        current_price = self.df.iloc[i]['close']
-                        
-                        # Breakout confirmation
-                        if current_price > resistance_level:
-                            signals.append({
-                                'index': i,
-                                'pattern': 'ascending_triangle',
-                                'resistance': resistance_level,
-                                'breakout_price': current_price,
-                                'direction': 'bullish'
-                            })
+        # Flat resistance through the swing highs, rising support under the swing lows
+        indices, levels = _scan_triangle(self._high, self._low, self._close, self._swing_highs,
+                                         self._swing_lows, lookback, tolerance, True)
+        
+        for i, resistance_level in zip(indices.tolist(), levels):
+            signals.append({
+                'index': i,
+                'pattern': 'ascending_triangle',
+                'resistance': resistance_level,
+                'breakout_price': self._close[i],
+                'direction': 'bullish'
+            })
         
         return signals
     
@@ -173,48 +719,18 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find swing highs and lows
-            highs = []
-            lows = []
-            
-            for j in range(1, len(window)-1):
-                if (window.iloc[j]['high'] > window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j+1]['high']):
-                    highs.append((j, window.iloc[j]['high']))
-                    
-                if (window.iloc[j]['low'] < window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j+1]['low']):
-                    lows.append((j, window.iloc[j]['low']))
-            
-            if len(highs) >= 2 and len(lows) >= 2:
-                # Check for horizontal support
-                low_prices = [l[1] for l in lows]
-                support_level = np.mean(low_prices)
-                horizontal_support = all(abs(l - support_level) / support_level < tolerance for l in low_prices)
-                
-                # Check for descending resistance
-                high_indices = [h[0] for h in highs]
-                high_prices = [h[1] for h in highs]
-                
-                if len(high_prices) >= 2:
-                    slope, _ = np.polyfit(high_indices, high_prices, 1)
-                    descending_resistance = slope < 0
-                    
-                    if horizontal_support and descending_resistance:
-                        current_price = self.df.iloc[i]['close']
-                        
-                        # Breakout confirmation
-                        if current_price < support_level:
-                            signals.append({
-                                'index': i,
-                                'pattern': 'descending_triangle',
-                                'support': support_level,
-                                'breakout_price': current_price,
-                                'direction': 'bearish'
-                            })
+        # Flat support through the swing lows, falling resistance over the swing highs
+        indices, levels = _scan_triangle(self._high, self._low, self._close, self._swing_highs,
+                                         self._swing_lows, lookback, tolerance, False)
+        
+        for i, support_level in zip(indices.tolist(), levels):
+            signals.append({
+                'index': i,
+                'pattern': 'descending_triangle',
+                'support': support_level,
+                'breakout_price': self._close[i],
+                'direction': 'bearish'
+            })
         
         return signals
     
@@ -225,55 +741,16 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find swing highs and lows
-            highs = []
-            lows = []
-            
-            for j in range(1, len(window)-1):
-                if (window.iloc[j]['high'] > window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j+1]['high']):
-                    highs.append((j, window.iloc[j]['high']))
-                    
-                if (window.iloc[j]['low'] < window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j+1]['low']):
-                    lows.append((j, window.iloc[j]['low']))
-            
-            if len(highs) >= 2 and len(lows) >= 2:
-                high_indices = [h[0] for h in highs]
-                high_prices = [h[1] for h in highs]
-                low_indices = [l[0] for l in lows]
-                low_prices = [l[1] for l in lows]
-                
-                # Calculate slopes
-                resistance_slope, resistance_intercept = np.polyfit(high_indices, high_prices, 1)
-                support_slope, support_intercept = np.polyfit(low_indices, low_prices, 1)
-                
-                # Converging lines (resistance descending, support ascending)
-                if resistance_slope < 0 and support_slope > 0:
-                    current_price = self.df.iloc[i]['close']
-                    
-                    # Calculate projected resistance and support
-                    resistance_at_current = resistance_slope * (lookback - 1) + resistance_intercept
-                    support_at_current = support_slope * (lookback - 1) + support_intercept
-                    
-                    # Check for breakout
-                    if current_price > resistance_at_current:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'symmetrical_triangle',
-                            'breakout_price': current_price,
-                            'direction': 'bullish'
-                        })
-                    elif current_price < support_at_current:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'symmetrical_triangle',
-                            'breakout_price': current_price,
-                            'direction': 'bearish'
-                        })
+        indices, directions = _scan_converging(self._high, self._low, self._close, self._swing_highs,
+                                               self._swing_lows, lookback, lookback, len(self.df), 0)
+        
+        for i, direction in zip(indices.tolist(), directions.tolist()):
+            signals.append({
+                'index': i,
+                'pattern': 'symmetrical_triangle',
+                'breakout_price': self._close[i],
+                'direction': 'bullish' if direction > 0 else 'bearish'
+            })
         
         return signals
     
@@ -289,40 +766,45 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback + 10, len(self.df)):
-            # Check for strong upward pole (previous 5-10 candles)
-            pole_start = i - lookback - 10
-            pole_end = i - lookback
+        first = lookback + 10
+        if first >= len(self.df):
+            return signals
+        
+        # Check for strong upward pole (previous 5-10 candles), for every bar at once
+        bars = np.arange(first, len(self.df))
+        pole_start = bars - lookback - 10
+        pole_end = bars - lookback
+        pole_gains = (self._close[pole_end-1] - self._close[pole_start]) / self._close[pole_start]
+        # Flag resistance: max of high[pole_end:i], one rolling max over the series
+        flag_resistance = sliding_window_view(self._high, lookback).max(axis=1)[pole_end]
+        
+        # Breakout above flag resistance (checked first: most candles aren't breakouts,
+        # so the trendline fits below rarely run)
+        candidates = (pole_gains > pole_strength) & (self._close[bars] > flag_resistance)
+        flag_indices = np.arange(lookback, dtype=np.float64)
+        
+        for k in np.flatnonzero(candidates).tolist():
+            i = first + k
+            pole_gain = pole_gains[k]
+            
+            flag_highs = self._high[i-lookback:i]
+            flag_lows = self._low[i-lookback:i]
+            current_price = self._close[i]
             
-            pole_data = self.df.iloc[pole_start:pole_end]
-            pole_gain = (pole_data.iloc[-1]['close'] - pole_data.iloc[0]['close']) / pole_data.iloc[0]['close']
+            # Check for flag (consolidation with slight downward slope)
+            # Flag should have parallel or slightly converging trendlines
+            high_slope, _ = _linfit(flag_indices, flag_highs)
+            low_slope, _ = _linfit(flag_indices, flag_lows)
             
-            if pole_gain > pole_strength:
-                # Check for flag (consolidation with slight downward slope)
-                flag_data = self.df.iloc[pole_end:i]
-                
-                flag_highs = flag_data['high'].values
-                flag_lows = flag_data['low'].values
-                flag_indices = np.arange(len(flag_data))
-                
-                # Flag should have parallel or slightly converging trendlines
-                high_slope, _ = np.polyfit(flag_indices, flag_highs, 1)
-                low_slope, _ = np.polyfit(flag_indices, flag_lows, 1)
-                
-                # Both slopes should be negative or flat (consolidation)
-                if high_slope <= 0 and low_slope <= 0:
-                    current_price = self.df.iloc[i]['close']
-                    flag_resistance = flag_data['high'].max()
-                    
-                    # Breakout above flag resistance
-                    if current_price > flag_resistance:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'bull_flag',
-                            'pole_gain': pole_gain,
-                            'breakout_price': current_price,
-                            'direction': 'bullish'
-                        })
+            # Both slopes should be negative or flat (consolidation)
+            if high_slope <= 0 and low_slope <= 0:
+                signals.append({
+                    'index': i,
+                    'pattern': 'bull_flag',
+                    'pole_gain': pole_gain,
+                    'breakout_price': current_price,
+                    'direction': 'bullish'
+                })
         
         return signals
     
@@ -332,39 +814,42 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback + 10, len(self.df)):
-            # Check for strong downward pole
-            pole_start = i - lookback - 10
-            pole_end = i - lookback
+        first = lookback + 10
+        if first >= len(self.df):
+            return signals
+        
+        # Check for strong downward pole
+        bars = np.arange(first, len(self.df))
+        pole_start = bars - lookback - 10
+        pole_end = bars - lookback
+        pole_losses = (self._close[pole_start] - self._close[pole_end-1]) / self._close[pole_start]
+        flag_support = sliding_window_view(self._low, lookback).min(axis=1)[pole_end]
+        
+        # Breakout below flag support (checked before the trendline fits)
+        candidates = (pole_losses > pole_strength) & (self._close[bars] < flag_support)
+        flag_indices = np.arange(lookback, dtype=np.float64)
+        
+        for k in np.flatnonzero(candidates).tolist():
+            i = first + k
+            pole_loss = pole_losses[k]
             
-            pole_data = self.df.iloc[pole_start:pole_end]
-            pole_loss = (pole_data.iloc[0]['close'] - pole_data.iloc[-1]['close']) / pole_data.iloc[0]['close']
+            flag_highs = self._high[i-lookback:i]
+            flag_lows = self._low[i-lookback:i]
+            current_price = self._close[i]
             
-            if pole_loss > pole_strength:
-                # Check for flag (upward consolidation)
-                flag_data = self.df.iloc[pole_end:i]
-                
-                flag_highs = flag_data['high'].values
-                flag_lows = flag_data['low'].values
-                flag_indices = np.arange(len(flag_data))
-                
-                high_slope, _ = np.polyfit(flag_indices, flag_highs, 1)
-                low_slope, _ = np.polyfit(flag_indices, flag_lows, 1)
-                
-                # Both slopes should be positive (upward consolidation)
-                if high_slope >= 0 and low_slope >= 0:
-                    current_price = self.df.iloc[i]['close']
-                    flag_support = flag_data['low'].min()
-                    
-                    # Breakout below flag support
-                    if current_price < flag_support:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'bear_flag',
-                            'pole_loss': pole_loss,
-                            'breakout_price': current_price,
-                            'direction': 'bearish'
-                        })
+            # Check for flag (upward consolidation)
+            high_slope, _ = _linfit(flag_indices, flag_highs)
+            low_slope, _ = _linfit(flag_indices, flag_lows)
+            
+            # Both slopes should be positive (upward consolidation)
+            if high_slope >= 0 and low_slope >= 0:
+                signals.append({
+                    'index': i,
+                    'pattern': 'bear_flag',
+                    'pole_loss': pole_loss,
+                    'breakout_price': current_price,
+                    'direction': 'bearish'
+                })
         
         return signals
     
@@ -377,43 +862,16 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            highs = []
-            lows = []
-            
-            for j in range(1, len(window)-1):
-                if (window.iloc[j]['high'] > window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j+1]['high']):
-                    highs.append((j, window.iloc[j]['high']))
-                    
-                if (window.iloc[j]['low'] < window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j+1]['low']):
-                    lows.append((j, window.iloc[j]['low']))
-            
-            if len(highs) >= 2 and len(lows) >= 2:
-                high_indices = [h[0] for h in highs]
-                high_prices = [h[1] for h in highs]
-                low_indices = [l[0] for l in lows]
-                low_prices = [l[1] for l in lows]
-                
-                resistance_slope, resistance_intercept = np.polyfit(high_indices, high_prices, 1)
-                support_slope, support_intercept = np.polyfit(low_indices, low_prices, 1)
-                
-                # Both ascending, support rising faster (converging)
-                if resistance_slope > 0 and support_slope > 0 and support_slope > resistance_slope:
-                    current_price = self.df.iloc[i]['close']
-                    support_at_current = support_slope * (lookback - 1) + support_intercept
-                    
-                    # Breakout below support
-                    if current_price < support_at_current:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'rising_wedge',
-                            'breakout_price': current_price,
-                            'direction': 'bearish'
-                        })
+        indices, _ = _scan_converging(self._high, self._low, self._close, self._swing_highs,
+                                      self._swing_lows, lookback, lookback, len(self.df), 1)
+        
+        for i in indices.tolist():
+            signals.append({
+                'index': i,
+                'pattern': 'rising_wedge',
+                'breakout_price': self._close[i],
+                'direction': 'bearish'
+            })
         
         return signals
     
@@ -424,46 +882,38 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            highs = []
-            lows = []
-            
-            for j in range(1, len(window)-1):
-                if (window.iloc[j]['high'] > window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j+1]['high']):
-                    highs.append((j, window.iloc[j]['high']))
-                    
-                if (window.iloc[j]['low'] < window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j+1]['low']):
-                    lows.append((j, window.iloc[j]['low']))
-            
-            if len(highs) >= 2 and len(lows) >= 2:
-                high_indices = [h[0] for h in highs]
-                high_prices = [h[1] for h in highs]
-                low_indices = [l[0] for l in lows]
-                low_prices = [l[1] for l in lows]
-                
-                resistance_slope, resistance_intercept = np.polyfit(high_indices, high_prices, 1)
-                support_slope, support_intercept = np.polyfit(low_indices, low_prices, 1)
-                
-                # Both descending, resistance falling faster (converging)
-                if resistance_slope < 0 and support_slope < 0 and resistance_slope < support_slope:
-                    current_price = self.df.iloc[i]['close']
-                    resistance_at_current = resistance_slope * (lookback - 1) + resistance_intercept
-                    
-                    # Breakout above resistance
-                    if current_price > resistance_at_current:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'falling_wedge',
-                            'breakout_price': current_price,
-                            'direction': 'bullish'
-                        })
+        indices, _ = _scan_converging(self._high, self._low, self._close, self._swing_highs,
+                                      self._swing_lows, lookback, lookback, len(self.df), 2)
+        
+        for i in indices.tolist():
+            signals.append(self._falling_wedge_signal(i))
         
         return signals
     
+    def detect_falling_wedge_at(self, i, lookback=20):
+        """
+        Falling wedge check for a single candle (the window of lookback candles before it)
+        
+        Lets the live scanner test just the latest candle instead of the whole frame.
+        
+        Returns:
+            Signal dict as in detect_falling_wedge, or None
+        """
+        indices, _ = _scan_converging(self._high, self._low, self._close, self._swing_highs,
+                                      self._swing_lows, lookback, i, i + 1, 2)
+        if len(indices) == 0:
+            return None
+        return self._falling_wedge_signal(i)
+    
+    def _falling_wedge_signal(self, i):
+        """Signal dict for a falling wedge breakout at candle i"""
+        return {
+            'index': i,
+            'pattern': 'falling_wedge',
+            'breakout_price': self._close[i],
+            'direction': 'bullish'
+        }
+    
     # ==================== DOUBLE TOP/BOTTOM ====================
     
     def detect_double_top(self, lookback=30, tolerance=0.01):
@@ -476,42 +926,18 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find peaks (swing highs)
-            peaks = []
-            for j in range(2, len(window)-2):
-                if (window.iloc[j]['high'] > window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j-2]['high'] and
-                    window.iloc[j]['high'] > window.iloc[j+1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j+2]['high']):
-                    peaks.append((i-lookback+j, window.iloc[j]['high']))
-            
-            # Need at least 2 peaks
-            if len(peaks) >= 2:
-                # Check last two peaks
-                peak1_idx, peak1_price = peaks[-2]
-                peak2_idx, peak2_price = peaks[-1]
-                
-                # Peaks should be similar in price
-                if abs(peak1_price - peak2_price) / peak1_price < tolerance:
-                    # Find the trough between peaks
-                    between_data = self.df.iloc[peak1_idx:peak2_idx]
-                    trough_price = between_data['low'].min()
-                    
-                    current_price = self.df.iloc[i]['close']
-                    
-                    # Breakout below neckline (trough)
-                    if current_price < trough_price:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'double_top',
-                            'peak_level': (peak1_price + peak2_price) / 2,
-                            'neckline': trough_price,
-                            'breakout_price': current_price,
-                            'direction': 'bearish'
-                        })
+        indices, levels, necklines = _scan_double(self._high, self._low, self._close, self._peaks,
+                                                  lookback, tolerance, True)
+        
+        for i, level, neckline in zip(indices.tolist(), levels, necklines):
+            signals.append({
+                'index': i,
+                'pattern': 'double_top',
+                'peak_level': level,
+                'neckline': neckline,
+                'breakout_price': self._close[i],
+                'direction': 'bearish'
+            })
         
         return signals
     
@@ -521,40 +947,18 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find troughs (swing lows)
-            troughs = []
-            for j in range(2, len(window)-2):
-                if (window.iloc[j]['low'] < window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j-2]['low'] and
-                    window.iloc[j]['low'] < window.iloc[j+1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j+2]['low']):
-                    troughs.append((i-lookback+j, window.iloc[j]['low']))
-            
-            if len(troughs) >= 2:
-                trough1_idx, trough1_price = troughs[-2]
-                trough2_idx, trough2_price = troughs[-1]
-                
-                # Troughs should be similar in price
-                if abs(trough1_price - trough2_price) / trough1_price < tolerance:
-                    # Find the peak between troughs
-                    between_data = self.df.iloc[trough1_idx:trough2_idx]
-                    peak_price = between_data['high'].max()
-                    
-                    current_price = self.df.iloc[i]['close']
-                    
-                    # Breakout above neckline (peak)
-                    if current_price > peak_price:
-                        signals.append({
-                            'index': i,
-                            'pattern': 'double_bottom',
-                            'trough_level': (trough1_price + trough2_price) / 2,
-                            'neckline': peak_price,
-                            'breakout_price': current_price,
-                            'direction': 'bullish'
-                        })
+        indices, levels, necklines = _scan_double(self._high, self._low, self._close, self._troughs,
+                                                  lookback, tolerance, False)
+        
+        for i, level, neckline in zip(indices.tolist(), levels, necklines):
+            signals.append({
+                'index': i,
+                'pattern': 'double_bottom',
+                'trough_level': level,
+                'neckline': neckline,
+                'breakout_price': self._close[i],
+                'direction': 'bullish'
+            })
         
         return signals
     
@@ -567,47 +971,20 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find peaks
-            peaks = []
-            for j in range(2, len(window)-2):
-                if (window.iloc[j]['high'] > window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j-2]['high'] and
-                    window.iloc[j]['high'] > window.iloc[j+1]['high'] and 
-                    window.iloc[j]['high'] > window.iloc[j+2]['high']):
-                    peaks.append((i-lookback+j, window.iloc[j]['high']))
-            
-            # Need exactly 3 peaks for classic H&S
-            if len(peaks) >= 3:
-                left_shoulder_idx, left_shoulder = peaks[-3]
-                head_idx, head = peaks[-2]
-                right_shoulder_idx, right_shoulder = peaks[-1]
-                
-                # Head should be highest
-                if head > left_shoulder and head > right_shoulder:
-                    # Shoulders should be similar height
-                    if abs(left_shoulder - right_shoulder) / left_shoulder < tolerance:
-                        # Find neckline (lows between peaks)
-                        left_trough = self.df.iloc[left_shoulder_idx:head_idx]['low'].min()
-                        right_trough = self.df.iloc[head_idx:right_shoulder_idx]['low'].min()
-                        neckline = (left_trough + right_trough) / 2
-                        
-                        current_price = self.df.iloc[i]['close']
-                        
-                        # Breakout below neckline
-                        if current_price < neckline:
-                            signals.append({
-                                'index': i,
-                                'pattern': 'head_and_shoulders',
-                                'head_price': head,
-                                'shoulder_price': (left_shoulder + right_shoulder) / 2,
-                                'neckline': neckline,
-                                'breakout_price': current_price,
-                                'direction': 'bearish',
-                                'target': neckline - (head - neckline)  # Measured move
-                            })
+        indices, heads, shoulders, necklines = _scan_head_shoulders(self._high, self._low, self._close, self._peaks,
+                                                                   lookback, tolerance, True)
+        
+        for i, head, shoulder, neckline in zip(indices.tolist(), heads, shoulders, necklines):
+            signals.append({
+                'index': i,
+                'pattern': 'head_and_shoulders',
+                'head_price': head,
+                'shoulder_price': shoulder,
+                'neckline': neckline,
+                'breakout_price': self._close[i],
+                'direction': 'bearish',
+                'target': neckline - (head - neckline)  # Measured move
+            })
         
         return signals
     
@@ -618,46 +995,20 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find troughs
-            troughs = []
-            for j in range(2, len(window)-2):
-                if (window.iloc[j]['low'] < window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j-2]['low'] and
-                    window.iloc[j]['low'] < window.iloc[j+1]['low'] and 
-                    window.iloc[j]['low'] < window.iloc[j+2]['low']):
-                    troughs.append((i-lookback+j, window.iloc[j]['low']))
-            
-            if len(troughs) >= 3:
-                left_shoulder_idx, left_shoulder = troughs[-3]
-                head_idx, head = troughs[-2]
-                right_shoulder_idx, right_shoulder = troughs[-1]
-                
-                # Head should be lowest
-                if head < left_shoulder and head < right_shoulder:
-                    # Shoulders should be similar
-                    if abs(left_shoulder - right_shoulder) / left_shoulder < tolerance:
-                        # Find neckline (highs between troughs)
-                        left_peak = self.df.iloc[left_shoulder_idx:head_idx]['high'].max()
-                        right_peak = self.df.iloc[head_idx:right_shoulder_idx]['high'].max()
-                        neckline = (left_peak + right_peak) / 2
-                        
-                        current_price = self.df.iloc[i]['close']
-                        
-                        # Breakout above neckline
-                        if current_price > neckline:
-                            signals.append({
-                                'index': i,
-                                'pattern': 'inverse_head_and_shoulders',
-                                'head_price': head,
-                                'shoulder_price': (left_shoulder + right_shoulder) / 2,
-                                'neckline': neckline,
-                                'breakout_price': current_price,
-                                'direction': 'bullish',
-                                'target': neckline + (neckline - head)  # Measured move
-                            })
+        indices, heads, shoulders, necklines = _scan_head_shoulders(self._high, self._low, self._close, self._troughs,
+                                                                   lookback, tolerance, False)
+        
+        for i, head, shoulder, neckline in zip(indices.tolist(), heads, shoulders, necklines):
+            signals.append({
+                'index': i,
+                'pattern': 'inverse_head_and_shoulders',
+                'head_price': head,
+                'shoulder_price': shoulder,
+                'neckline': neckline,
+                'breakout_price': self._close[i],
+                'direction': 'bullish',
+                'target': neckline + (neckline - head)  # Measured move
+            })
         
         return signals
     
@@ -670,43 +1021,28 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Fit a polynomial curve to the highs
-            indices = np.arange(len(window))
-            highs = window['high'].values
-            
-            # Use quadratic fit
-            try:
-                coeffs = np.polyfit(indices, highs, 2)
-                
-                # Negative quadratic coefficient indicates downward curve
-                if coeffs[0] < 0:
-                    # Calculate R-squared to measure fit quality
-                    fitted_curve = np.polyval(coeffs, indices)
-                    residuals = highs - fitted_curve
-                    ss_res = np.sum(residuals**2)
-                    ss_tot = np.sum((highs - np.mean(highs))**2)
-                    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-                    
-                    # Good curve fit (R² > 0.7) indicates rounded pattern
-                    if r_squared > 0.7:
-                        current_price = self.df.iloc[i]['close']
-                        support_level = window['low'].min()
-                        
-                        # Breakout below support
-                        if current_price < support_level:
-                            signals.append({
-                                'index': i,
-                                'pattern': 'rounded_top',
-                                'curve_quality': r_squared,
-                                'support_level': support_level,
-                                'breakout_price': current_price,
-                                'direction': 'bearish'
-                            })
-            except:
-                pass
+        n = len(self.df)
+        if lookback < 3 or lookback >= n:
+            return signals
+        
+        # Breakout below the window's low, checked first: it rules out most windows before any fit
+        support = _rolling_extreme(self._low, lookback, False)[:n-lookback]
+        starts = np.flatnonzero(self._close[lookback:] < support)
+        
+        # Quadratic fit to the highs; a downward curve with R² > 0.7 is a rounded pattern
+        r_squared = _rounded_fits(self._high, lookback, False, starts)
+        curved = r_squared > 0.7
+        
+        for k, r2 in zip(starts[curved].tolist(), r_squared[curved]):
+            i = lookback + k
+            signals.append({
+                'index': i,
+                'pattern': 'rounded_top',
+                'curve_quality': r2,
+                'support_level': support[k],
+                'breakout_price': self._close[i],
+                'direction': 'bearish'
+            })
         
         return signals
     
@@ -717,39 +1053,27 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            indices = np.arange(len(window))
-            lows = window['low'].values
-            
-            try:
-                coeffs = np.polyfit(indices, lows, 2)
-                
-                # Positive quadratic coefficient indicates upward curve
-                if coeffs[0] > 0:
-                    fitted_curve = np.polyval(coeffs, indices)
-                    residuals = lows - fitted_curve
-                    ss_res = np.sum(residuals**2)
-                    ss_tot = np.sum((lows - np.mean(lows))**2)
-                    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-                    
-                    if r_squared > 0.7:
-                        current_price = self.df.iloc[i]['close']
-                        resistance_level = window['high'].max()
-                        
-                        # Breakout above resistance
-                        if current_price > resistance_level:
-                            signals.append({
-                                'index': i,
-                                'pattern': 'rounded_bottom',
-                                'curve_quality': r_squared,
-                                'resistance_level': resistance_level,
-                                'breakout_price': current_price,
-                                'direction': 'bullish'
-                            })
-            except:
-                pass
+        n = len(self.df)
+        if lookback < 3 or lookback >= n:
+            return signals
+        
+        # Breakout above the window's high
+        resistance = _rolling_extreme(self._high, lookback, True)[:n-lookback]
+        starts = np.flatnonzero(self._close[lookback:] > resistance)
+        
+        r_squared = _rounded_fits(self._low, lookback, True, starts)
+        curved = r_squared > 0.7
+        
+        for k, r2 in zip(starts[curved].tolist(), r_squared[curved]):
+            i = lookback + k
+            signals.append({
+                'index': i,
+                'pattern': 'rounded_bottom',
+                'curve_quality': r2,
+                'resistance_level': resistance[k],
+                'breakout_price': self._close[i],
+                'direction': 'bullish'
+            })
         
         return signals
     
@@ -762,54 +1086,84 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback + handle_size, len(self.df)):
-            # Cup phase
-            cup_data = self.df.iloc[i-lookback-handle_size:i-handle_size]
-            
-            indices = np.arange(len(cup_data))
-            lows = cup_data['low'].values
-            
-            try:
-                # Check for U-shaped cup
-                coeffs = np.polyfit(indices, lows, 2)
-                
-                if coeffs[0] > 0:  # Upward curve
-                    fitted_curve = np.polyval(coeffs, indices)
-                    residuals = lows - fitted_curve
-                    ss_res = np.sum(residuals**2)
-                    ss_tot = np.sum((lows - np.mean(lows))**2)
-                    r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
-                    
-                    if r_squared > 0.6:  # Good cup formation
-                        # Handle phase (smaller consolidation)
-                        handle_data = self.df.iloc[i-handle_size:i]
-                        
-                        # Handle should be in upper half of cup
-                        cup_depth = cup_data['high'].max() - cup_data['low'].min()
-                        handle_depth = handle_data['high'].max() - handle_data['low'].min()
-                        
-                        if handle_depth < cup_depth * 0.5:  # Handle shallower than cup
-                            current_price = self.df.iloc[i]['close']
-                            resistance = handle_data['high'].max()
-                            
-                            # Breakout above handle
-                            if current_price > resistance:
-                                signals.append({
-                                    'index': i,
-                                    'pattern': 'cup_and_handle',
-                                    'cup_depth': cup_depth,
-                                    'handle_resistance': resistance,
-                                    'breakout_price': current_price,
-                                    'direction': 'bullish',
-                                    'target': resistance + cup_depth  # Measured move
-                                })
-            except:
-                pass
+        n = len(self.df)
+        first = lookback + handle_size
+        if lookback < 3 or handle_size < 1 or first >= n:
+            return signals
+        
+        # Breakout above the handle (the handle_size candles before bar i), checked first
+        handle_highs = _rolling_extreme(self._high, handle_size, True)[lookback:n-handle_size]
+        starts = np.flatnonzero(self._close[first:] > handle_highs)  # bar i's cup starts at i - first
+        handle_high = handle_highs[starts]
+        
+        # Handle phase (smaller consolidation) shallower than half the cup
+        handle_depth = handle_high - sliding_window_view(self._low, handle_size)[starts + lookback].min(axis=1)
+        cup_depth = (sliding_window_view(self._high, lookback)[starts].max(axis=1)
+                     - sliding_window_view(self._low, lookback)[starts].min(axis=1))
+        shallow = handle_depth < cup_depth * 0.5
+        starts, handle_high, cup_depth = starts[shallow], handle_high[shallow], cup_depth[shallow]
+        
+        # Cup phase: U-shaped fit to the lows
+        r_squared = _rounded_fits(self._low, lookback, True, starts)
+        
+        for k in np.flatnonzero(r_squared > 0.6).tolist():  # Good cup formation
+            i = first + int(starts[k])
+            resistance = handle_high[k]
+            signals.append({
+                'index': i,
+                'pattern': 'cup_and_handle',
+                'cup_depth': cup_depth[k],
+                'handle_resistance': resistance,
+                'breakout_price': self._close[i],
+                'direction': 'bullish',
+                'target': resistance + cup_depth[k]  # Measured move
+            })
         
         return signals
     
     # ==================== TREND PATTERNS ====================
     
+    def _staircase_scan(self, lookback, ascending):
+        """
+        Bars whose lookback window holds at least two staircase swing highs and
+        two swing lows, each strictly rising (ascending) or falling in turn
+        
+        A window fails when a consecutive pair of swing points that is out of
+        order lies entirely inside it, so each bar only needs the most recent
+        broken pair ending before its window does.
+        
+        Returns:
+            (bar indices, swing highs + swing lows in each bar's window)
+        """
+        bars = np.arange(lookback, len(self.df))
+        if lookback < 3:
+            return bars[:0], bars[:0]
+        # Swing points of bar i's window lie at i-lookback+1 .. i-2
+        first = bars - lookback + 1
+        last = bars - 2
+        
+        passed = np.ones(len(bars), dtype=bool)
+        strength = np.zeros(len(bars), dtype=np.int64)
+        for points, values in ((self._step_highs, self._high), (self._step_lows, self._low)):
+            count = np.searchsorted(points, last, side='right') - np.searchsorted(points, first)
+            passed &= count >= 2
+            strength += count
+            if len(points) < 2:
+                continue
+            
+            prices = values[points]
+            in_order = prices[1:] > prices[:-1] if ascending else prices[1:] < prices[:-1]
+            # Position of the first point of the latest out-of-order pair ending at or before each point
+            broken_from = np.full(len(points), -1, dtype=np.int64)
+            broken_from[1:] = np.where(in_order, -1, points[:-1])
+            broken_from = np.maximum.accumulate(broken_from)
+            
+            last_point = np.maximum(np.searchsorted(points, last, side='right') - 1, 0)
+            passed &= broken_from[last_point] < first
+        
+        hits = np.flatnonzero(passed)
+        return bars[hits], strength[hits]
+    
     def detect_ascending_staircase(self, lookback=20):
         """
         Ascending Staircase: Higher highs and higher lows
@@ -817,34 +1171,15 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            # Find swing highs and lows
-            highs = []
-            lows = []
-            
-            for j in range(1, len(window)-1):
-                if (window.iloc[j]['high'] >= window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] >= window.iloc[j+1]['high']):
-                    highs.append(window.iloc[j]['high'])
-                    
-                if (window.iloc[j]['low'] <= window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] <= window.iloc[j+1]['low']):
-                    lows.append(window.iloc[j]['low'])
-            
-            # Check for higher highs and higher lows
-            if len(highs) >= 2 and len(lows) >= 2:
-                higher_highs = all(highs[i] > highs[i-1] for i in range(1, len(highs)))
-                higher_lows = all(lows[i] > lows[i-1] for i in range(1, len(lows)))
-                
-                if higher_highs and higher_lows:
-                    signals.append({
-                        'index': i,
-                        'pattern': 'ascending_staircase',
-                        'direction': 'bullish',
-                        'strength': len(highs) + len(lows)
-                    })
+        indices, strengths = self._staircase_scan(lookback, True)
+        
+        for i, strength in zip(indices.tolist(), strengths.tolist()):
+            signals.append({
+                'index': i,
+                'pattern': 'ascending_staircase',
+                'direction': 'bullish',
+                'strength': strength
+            })
         
         return signals
     
@@ -855,32 +1190,15 @@ class PatternDetector:
         """
         signals = []
         
-        for i in range(lookback, len(self.df)):
-            window = self.df.iloc[i-lookback:i]
-            
-            highs = []
-            lows = []
-            
-            for j in range(1, len(window)-1):
-                if (window.iloc[j]['high'] >= window.iloc[j-1]['high'] and 
-                    window.iloc[j]['high'] >= window.iloc[j+1]['high']):
-                    highs.append(window.iloc[j]['high'])
-                    
-                if (window.iloc[j]['low'] <= window.iloc[j-1]['low'] and 
-                    window.iloc[j]['low'] <= window.iloc[j+1]['low']):
-                    lows.append(window.iloc[j]['low'])
-            
-            if len(highs) >= 2 and len(lows) >= 2:
-                lower_highs = all(highs[i] < highs[i-1] for i in range(1, len(highs)))
-                lower_lows = all(lows[i] < lows[i-1] for i in range(1, len(lows)))
-                
-                if lower_highs and lower_lows:
-                    signals.append({
-                        'index': i,
-                        'pattern': 'descending_staircase',
-                        'direction': 'bearish',
-                        'strength': len(highs) + len(lows)
-                    })
+        indices, strengths = self._staircase_scan(lookback, False)
+        
+        for i, strength in zip(indices.tolist(), strengths.tolist()):
+            signals.append({
+                'index': i,
+                'pattern': 'descending_staircase',
+                'direction': 'bearish',
+                'strength': strength
+            })
         
         return signals
     
@@ -891,97 +1209,102 @@ class PatternDetector:
         Run all pattern detectors and return consolidated results
         """
         all_patterns = []
-        
-        print("\n🔍 Detecting All Patterns...")
-        print("=" * 60)
+        # Signals per detector, reported in one log record at the end
+        counts = {}
         
         # Engulfing patterns
         bullish_eng = self.detect_bullish_engulfing()
         for idx in bullish_eng:
             all_patterns.append({'index': idx, 'pattern': 'bullish_engulfing', 'direction': 'bullish'})
-        print(f"✓ Bullish Engulfing: {len(bullish_eng)} signals")
+        counts['Bullish Engulfing'] = len(bullish_eng)
         
         bearish_eng = self.detect_bearish_engulfing()
         for idx in bearish_eng:
             all_patterns.append({'index': idx, 'pattern': 'bearish_engulfing', 'direction': 'bearish'})
-        print(f"✓ Bearish Engulfing: {len(bearish_eng)} signals")
+        counts['Bearish Engulfing'] = len(bearish_eng)
         
         # Triangle patterns
         asc_tri = self.detect_ascending_triangle()
         all_patterns.extend(asc_tri)
-        print(f"✓ Ascending Triangle: {len(asc_tri)} signals")
+        counts['Ascending Triangle'] = len(asc_tri)
         
         desc_tri = self.detect_descending_triangle()
         all_patterns.extend(desc_tri)
-        print(f"✓ Descending Triangle: {len(desc_tri)} signals")
+        counts['Descending Triangle'] = len(desc_tri)
         
         sym_tri = self.detect_symmetrical_triangle()
         all_patterns.extend(sym_tri)
-        print(f"✓ Symmetrical Triangle: {len(sym_tri)} signals")
+        counts['Symmetrical Triangle'] = len(sym_tri)
         
         # Flag patterns
         bull_flags = self.detect_bull_flag()
         all_patterns.extend(bull_flags)
-        print(f"✓ Bull Flag: {len(bull_flags)} signals")
+        counts['Bull Flag'] = len(bull_flags)
         
         bear_flags = self.detect_bear_flag()
         all_patterns.extend(bear_flags)
-        print(f"✓ Bear Flag: {len(bear_flags)} signals")
+        counts['Bear Flag'] = len(bear_flags)
         
         # Wedge patterns
         rising_wedge = self.detect_rising_wedge()
         all_patterns.extend(rising_wedge)
-        print(f"✓ Rising Wedge: {len(rising_wedge)} signals")
+        counts['Rising Wedge'] = len(rising_wedge)
         
         falling_wedge = self.detect_falling_wedge()
         all_patterns.extend(falling_wedge)
-        print(f"✓ Falling Wedge: {len(falling_wedge)} signals")
+        counts['Falling Wedge'] = len(falling_wedge)
         
         # Double patterns
         double_top = self.detect_double_top()
         all_patterns.extend(double_top)
-        print(f"✓ Double Top: {len(double_top)} signals")
+        counts['Double Top'] = len(double_top)
         
         double_bottom = self.detect_double_bottom()
         all_patterns.extend(double_bottom)
-        print(f"✓ Double Bottom: {len(double_bottom)} signals")
+        counts['Double Bottom'] = len(double_bottom)
         
         # Head and shoulders
         h_and_s = self.detect_head_and_shoulders()
         all_patterns.extend(h_and_s)
-        print(f"✓ Head and Shoulders: {len(h_and_s)} signals")
+        counts['Head and Shoulders'] = len(h_and_s)
         
         inv_h_and_s = self.detect_inverse_head_and_shoulders()
         all_patterns.extend(inv_h_and_s)
-        print(f"✓ Inverse H&S: {len(inv_h_and_s)} signals")
+        counts['Inverse H&S'] = len(inv_h_and_s)
         
         # Rounded patterns
         rounded_top = self.detect_rounded_top()
         all_patterns.extend(rounded_top)
-        print(f"✓ Rounded Top: {len(rounded_top)} signals")
+        counts['Rounded Top'] = len(rounded_top)
         
         rounded_bottom = self.detect_rounded_bottom()
         all_patterns.extend(rounded_bottom)
-        print(f"✓ Rounded Bottom: {len(rounded_bottom)} signals")
+        counts['Rounded Bottom'] = len(rounded_bottom)
         
         # Cup and handle
         cup_handle = self.detect_cup_and_handle()
         all_patterns.extend(cup_handle)
-        print(f"✓ Cup and Handle: {len(cup_handle)} signals")
+        counts['Cup and Handle'] = len(cup_handle)
         
         # Trend patterns
         asc_stair = self.detect_ascending_staircase()
         all_patterns.extend(asc_stair)
-        print(f"✓ Ascending Staircase: {len(asc_stair)} signals")
+        counts['Ascending Staircase'] = len(asc_stair)
         
         desc_stair = self.detect_descending_staircase()
         all_patterns.extend(desc_stair)
-        print(f"✓ Descending Staircase: {len(desc_stair)} signals")
-        
-        print("=" * 60)
-        print(f"✅ TOTAL PATTERNS DETECTED: {len(all_patterns)}")
-        
-        return sorted(all_patterns, key=lambda x: x['index'])
+        counts['Descending Staircase'] = len(desc_stair)
+        
+        if logger.isEnabledFor(logging.INFO):
+            lines = ["🔍 Detecting All Patterns...", "=" * 60]
+            lines += [f"✓ {name}: {count} signals" for name, count in counts.items()]
+            lines += ["=" * 60, f"✅ TOTAL PATTERNS DETECTED: {len(all_patterns)}"]
+            logger.info("\n".join(lines))
+        
+        # Stable sort by candle index (patterns on the same candle keep detector order)
+        indices = np.fromiter((pattern['index'] for pattern in all_patterns), dtype=np.int64,
+                              count=len(all_patterns))
+        return [all_patterns[k] for k in np.argsort(indices, kind='stable').tolist()]
     
     # ==================== FILTERED PATTERNS WITH CONTEXT ====================
     
@@ -994,40 +1317,35 @@ class PatternDetector:
         - S/R confluence
         """
         quality_signals = []
-        
-        for pattern in pattern_results:
-            idx = pattern['index']
-            
-            if idx >= len(self.df):
-                continue
-            
-            candle = self.df.iloc[idx]
-            
-            # Skip if missing data
-            if pd.isna(candle['rsi']) or pd.isna(candle['volume_ratio']):
-                continue
-            
-            # Volume confirmation
-            volume_ok = candle['volume_ratio'] > 1.2  # 20% above average
-            
-            # RSI context
-            if pattern['direction'] == 'bullish':
-                rsi_ok = candle['rsi'] < 70  # Not overbought
-            else:
-                rsi_ok = candle['rsi'] > 30  # Not oversold
-            
-            # Add quality score
-            quality_score = 0
-            if volume_ok:
-                quality_score += 1
-            if rsi_ok:
-                quality_score += 1
-            
-            if quality_score >= 1:  # At least one confirmation
-                pattern['quality_score'] = quality_score
-                pattern['volume_ratio'] = candle['volume_ratio']
-                pattern['rsi'] = candle['rsi']
-                quality_signals.append(pattern)
+        if len(pattern_results) == 0:
+            return quality_signals
+        
+        # Gather every pattern's candle values at once (out-of-range indices are dropped below)
+        count = len(pattern_results)
+        indices = np.fromiter((pattern['index'] for pattern in pattern_results), dtype=np.int64, count=count)
+        in_range = indices < len(self.df)
+        at = np.where(in_range, indices, 0)
+        rsi = self._rsi[at]
+        volume_ratio = self._volume_ratio[at]
+        bullish = np.fromiter((pattern['direction'] == 'bullish' for pattern in pattern_results),
+                              dtype=bool, count=count)
+        
+        # Volume confirmation
+        volume_ok = volume_ratio > 1.2  # 20% above average
+        
+        # RSI context: bullish not overbought, bearish not oversold
+        rsi_ok = np.where(bullish, rsi < 70, rsi > 30)
+        
+        # Add quality score; skip missing data, keep at least one confirmation
+        quality_scores = volume_ok.astype(np.int64) + rsi_ok
+        keep = in_range & ~np.isnan(rsi) & ~np.isnan(volume_ratio) & (quality_scores >= 1)
+        
+        for k in np.flatnonzero(keep).tolist():
+            pattern = pattern_results[k]
+            pattern['quality_score'] = int(quality_scores[k])
+            pattern['volume_ratio'] = volume_ratio[k]
+            pattern['rsi'] = rsi[k]
+            quality_signals.append(pattern)
         
         return quality_signals
     
@@ -1038,29 +1356,62 @@ class PatternDetector:
         if index >= len(self.df) or index < 0:
             return None
         
-        candle = self.df.iloc[index]
-        prev_candle = self.df.iloc[index-1] if index > 0 else None
-        
         details = {
-            'time': candle['time'],
-            'open': candle['open'],
-            'high': candle['high'],
-            'low': candle['low'],
-            'close': candle['close'],
-            'volume': candle['volume'],
-            'body_size': candle['body'],
-            'is_green': candle['close'] > candle['open'],
-            'rsi': candle['rsi'],
-            'ema_50': candle['ema_50'],
-            'volume_ratio': candle['volume_ratio']
+            'time': self.df['time'].iat[index],
+            'open': self._open[index],
+            'high': self._high[index],
+            'low': self._low[index],
+            'close': self._close[index],
+            'volume': self._volume[index],
+            'body_size': self._body[index],
+            'is_green': self._is_green[index],
+            'rsi': self._rsi[index],
+            'ema_50': self._ema_50[index],
+            'volume_ratio': self._volume_ratio[index]
         }
         
-        if prev_candle is not None:
-            details['prev_body_size'] = prev_candle['body']
-            details['body_ratio'] = details['body_size'] / prev_candle['body'] if prev_candle['body'] > 0 else 0
+        if index > 0:
+            prev_body = self._body[index-1]
+            details['prev_body_size'] = prev_body
+            details['body_ratio'] = details['body_size'] / prev_body if prev_body > 0 else 0
         
         return details
     
+    def get_pattern_details_batch(self, indices):
+        """
+        get_pattern_details for many indices in one pass
+        
+        Returns:
+            DataFrame indexed by pattern index with the same fields as columns
+            (out-of-range indices are dropped; prev_body_size and body_ratio are
+            NaN at index 0, where get_pattern_details leaves them out)
+        """
+        idx = np.asarray(indices, dtype=np.intp)
+        idx = idx[(idx >= 0) & (idx < len(self.df))]
+        has_prev = idx > 0
+        body = self._body[idx]
+        prev_body = np.where(has_prev, self._body[idx - has_prev], np.nan)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            body_ratio = np.where(prev_body > 0, body / prev_body, 0.0)
+        body_ratio[~has_prev] = np.nan
+        
+        return pd.DataFrame({
+            'time': self.df['time'].array[idx],
+            'open': self._open[idx],
+            'high': self._high[idx],
+            'low': self._low[idx],
+            'close': self._close[idx],
+            'volume': self._volume[idx],
+            'body_size': body,
+            'is_green': self._is_green[idx],
+            'rsi': self._rsi[idx],
+            'ema_50': self._ema_50[idx],
+            'volume_ratio': self._volume_ratio[idx],
+            'prev_body_size': prev_body,
+            'body_ratio': body_ratio
+        }, index=idx)
+    
     def calculate_risk_reward(self, entry, stop_loss, target):
         """Calculate risk-reward ratio"""
         risk = abs(entry - stop_loss)
@@ -1078,59 +1429,38 @@ class PatternDetector:
         """
         Bullish engulfing with quality filters (legacy method)
         """
-        raw_signals = self.detect_bullish_engulfing(min_body_ratio)
-        filtered_signals = []
+        rsi, close, ema_50, volume_ratio = self._rsi, self._close, self._ema_50, self._volume_ratio
         
-        for idx in raw_signals:
-            if idx >= len(self.df):
-                continue
-                
-            candle = self.df.iloc[idx]
-            
-            # RSI filter: Look for oversold or neutral
-            if pd.isna(candle['rsi']) or candle['rsi'] > 40:
-                continue
-            
-            # Below EMA filter: Price below moving average (potential reversal)
-            if pd.isna(candle['ema_50']) or candle['close'] > candle['ema_50']:
-                continue
-            
-            # Volume confirmation
-            if pd.isna(candle['volume_ratio']) or candle['volume_ratio'] < 1.0:
-                continue
-            
-            filtered_signals.append(idx)
+        # Comparisons against NaN are False, so warm-up candles never pass
+        passes = (
+            (rsi <= 40) &            # RSI filter: Look for oversold or neutral
+            (close <= ema_50) &      # Below EMA filter: Price below moving average (potential reversal)
+            (volume_ratio >= 1.0)    # Volume confirmation
+        )
         
-        return filtered_signals
+        return np.flatnonzero(self._engulfing_mask(min_body_ratio, bullish=True) & passes).tolist()
     
     def detect_bearish_engulfing_filtered(self, min_body_ratio=1.5):
         """
         Bearish engulfing with quality filters (legacy method)
         """
-        raw_signals = self.detect_bearish_engulfing(min_body_ratio)
-        filtered_signals = []
+        rsi, close, ema_50, volume_ratio = self._rsi, self._close, self._ema_50, self._volume_ratio
         
-        for idx in raw_signals:
-            if idx >= len(self.df):
-                continue
-                
-            candle = self.df.iloc[idx]
-            
-            # RSI filter: Look for overbought or neutral
-            if pd.isna(candle['rsi']) or candle['rsi'] < 60:
-                continue
-            
-            # Above EMA filter: Price above moving average (potential reversal)
-            if pd.isna(candle['ema_50']) or candle['close'] < candle['ema_50']:
-                continue
-            
-            # Volume confirmation
-            if pd.isna(candle['volume_ratio']) or candle['volume_ratio'] < 1.0:
-                continue
-            
-            filtered_signals.append(idx)
+        # Comparisons against NaN are False, so warm-up candles never pass
+        passes = (
+            (rsi >= 60) &            # RSI filter: Look for overbought or neutral
+            (close >= ema_50) &      # Above EMA filter: Price above moving average (potential reversal)
+            (volume_ratio >= 1.0)    # Volume confirmation
+        )
         
-        return filtered_signals
+        return np.flatnonzero(self._engulfing_mask(min_body_ratio, bullish=False) & passes).tolist()
+    
+    def _sr_detector(self):
+        """SupportResistanceDetector over the last 150 candles, rebuilt only if candles were added"""
+        if self._sr is None or self._sr_len != len(self.df):
+            self._sr = SupportResistanceDetector(self.df, lookback_candles=150)
+            self._sr_len = len(self.df)
+        return self._sr
     
     def detect_bullish_engulfing_with_SR(self, min_body_ratio=1.5):
         """
@@ -1139,46 +1469,38 @@ class PatternDetector:
         Returns:
             List of dicts with pattern details and S/R levels
         """
-        try:
-            from support_resistance import SupportResistanceDetector
-        except ImportError:
+        if SupportResistanceDetector is None:
             print("⚠️  Warning: support_resistance module not found. Returning filtered signals without S/R.")
             filtered = self.detect_bullish_engulfing_filtered(min_body_ratio)
-            return [{'index': idx, 'price': self.df.iloc[idx]['close']} for idx in filtered]
+            return [{'index': idx, 'price': self._close[idx]} for idx in filtered]
         
         filtered_signals = self.detect_bullish_engulfing_filtered(min_body_ratio)
         
-        sr_detector = SupportResistanceDetector(self.df, lookback_candles=150)
+        sr_detector = self._sr_detector()
         
-        sr_confirmed = []
-        
-        for idx in filtered_signals:
-            if idx >= len(self.df):
-                continue
-                
-            candle = self.df.iloc[idx]
-            price = candle['close']
-            
-            try:
-                at_support, support_info = sr_detector.is_at_support(price, tolerance_pct=0.3)
-                
-                if at_support and support_info and support_info.get('strength', 0) >= 2:
-                    sr_confirmed.append({
-                        'index': idx,
-                        'price': price,
-                        'support_level': support_info['price'],
-                        'support_strength': support_info['strength']
-                    })
-            except Exception as e:
-                # If S/R check fails, still include the signal without S/R data
-                sr_confirmed.append({
-                    'index': idx,
-                    'price': price,
-                    'support_level': None,
-                    'support_strength': 0
-                })
+        prices = self._close[filtered_signals]
         
-        return sr_confirmed
+        try:
+            # One vectorised level lookup for every filtered signal
+            levels, strengths, matched = sr_detector.first_levels_within(prices, 'support', tolerance_pct=0.3)
+        except Exception as e:
+            # If S/R check fails, still include the signals without S/R data
+            return [{
+                'index': idx,
+                'price': price,
+                'support_level': None,
+                'support_strength': 0
+            } for idx, price in zip(filtered_signals, prices)]
+        
+        confirmed = matched >= 0
+        confirmed[confirmed] = strengths[matched[confirmed]] >= 2
+        
+        return [{
+            'index': filtered_signals[k],
+            'price': prices[k],
+            'support_level': levels[matched[k]]['price'],
+            'support_strength': levels[matched[k]]['strength']
+        } for k in np.flatnonzero(confirmed)]
     
     def detect_bearish_engulfing_with_SR(self, min_body_ratio=1.5):
         """
@@ -1187,43 +1509,35 @@ class PatternDetector:
         Returns:
             List of dicts with pattern details and S/R levels
         """
-        try:
-            from support_resistance import SupportResistanceDetector
-        except ImportError:
+        if SupportResistanceDetector is None:
             print("⚠️  Warning: support_resistance module not found. Returning filtered signals without S/R.")
             filtered = self.detect_bearish_engulfing_filtered(min_body_ratio)
-            return [{'index': idx, 'price': self.df.iloc[idx]['close']} for idx in filtered]
+            return [{'index': idx, 'price': self._close[idx]} for idx in filtered]
         
         filtered_signals = self.detect_bearish_engulfing_filtered(min_body_ratio)
         
-        sr_detector = SupportResistanceDetector(self.df, lookback_candles=150)
-        sr_confirmed = []
+        sr_detector = self._sr_detector()
+        prices = self._close[filtered_signals]
         
-        for idx in filtered_signals:
-            if idx >= len(self.df):
-                continue
-                
-            candle = self.df.iloc[idx]
-            price = candle['close']
-            
-            try:
-                at_resistance, resistance_info = sr_detector.is_at_resistance(price, tolerance_pct=0.3)
-                
-                if at_resistance and resistance_info and resistance_info.get('strength', 0) >= 2:
-                    sr_confirmed.append({
-                        'index': idx,
-                        'price': price,
-                        'resistance_level': resistance_info['price'],
-                        'resistance_strength': resistance_info['strength']
-                    })
-            except Exception as e:
-                # If S/R check fails, still include the signal without S/R data
-                sr_confirmed.append({
-                    'index': idx,
-                    'price': price,
-                    'resistance_level': None,
-                    'resistance_strength': 0
-                })
-        
-        return sr_confirmed
+        try:
+            # One vectorised level lookup for every filtered signal
+            levels, strengths, matched = sr_detector.first_levels_within(prices, 'resistance', tolerance_pct=0.3)
+        except Exception as e:
+            # If S/R check fails, still include the signals without S/R data
+            return [{
+                'index': idx,
+                'price': price,
+                'resistance_level': None,
+                'resistance_strength': 0
+            } for idx, price in zip(filtered_signals, prices)]
+        
+        confirmed = matched >= 0
+        confirmed[confirmed] = strengths[matched[confirmed]] >= 2
+        
+        return [{
+            'index': filtered_signals[k],
+            'price': prices[k],
+            'resistance_level': levels[matched[k]]['price'],
+            'resistance_strength': levels[matched[k]]['strength']
+        } for k in np.flatnonzero(confirmed)]
                                 
\ No newline at end of file
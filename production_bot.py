@@ -1,14 +1,18 @@
 from live_scanner import LiveScanner
 import argparse
+import logging
 
 def main():
     parser = argparse.ArgumentParser(description='Gold Trading Bot')
     parser.add_argument('--auto', action='store_true', help='Enable auto-trading (DEMO ONLY)')
     parser.add_argument('--timeframe', type=int, default=15, help='Timeframe in minutes')
-    parser.add_argument('--interval', type=int, default=60, help='Scan interval in seconds')
+    parser.add_argument('--interval', type=int, default=60, help='Back-off in seconds while no ticks arrive (market closed)')
     
     args = parser.parse_args()
     
+    # Order and indicator status lines go through logging; show them like the prints around them
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     if args.auto:
         print("⚠️  WARNING: Auto-trading enabled")
         print("⚠️  Ensure you're using a DEMO account")
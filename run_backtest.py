@@ -1,7 +1,11 @@
+import numpy as np
 from market_data import MarketDataFetcher
 from pattern_detector import PatternDetector
 from backtest_engine import BacktestEngine
-import pandas as pd
+import logging
+
+# PatternDetector's status lines go through logging; show them like the prints around them
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 print("Fetching historical data...")
 fetcher = MarketDataFetcher()
@@ -20,31 +24,26 @@ print(f"Found {len(bullish_signals)} high-quality bullish engulfing setups")
 backtest = BacktestEngine(initial_capital=10000, risk_per_trade_pct=1.0)
 
 print("\nSimulating trades...")
-for signal in bullish_signals:
-    idx = signal['index']
-    entry_candle = df.iloc[idx]
-    
-    direction = 'long'
-    entry_price = entry_candle['close']
-    
-    stop_loss = entry_candle['low'] - 2
-    
-    risk = entry_price - stop_loss
-    take_profit = entry_price + (risk * 2)
-    
-    trade = backtest.simulate_trade(
-        direction=direction,
-        entry_price=entry_price,
-        stop_loss=stop_loss,
-        take_profit=take_profit,
-        entry_time=entry_candle['time'],
-        df=df
-    )
+# Entry, stop and target for every signal at once
+entry_idx = np.array([signal['index'] for signal in bullish_signals], dtype=np.int64)
+entry_prices = df['close'].to_numpy()[entry_idx]
+stop_losses = df['low'].to_numpy()[entry_idx] - 2
+risks = entry_prices - stop_losses
+take_profits = entry_prices + (risks * 2)
+entry_times = df['time'].array[entry_idx]
+
+# One scan finds every trade's exit; trades are then booked in order for the running capital
+exit_idx, exit_price, exit_reason = backtest.scan_exits(df, entry_idx, stop_losses, take_profits,
+                                                        np.ones(len(entry_idx), dtype=bool))
+
+for k in range(len(entry_idx)):
+    trade = backtest.record_trade('long', entry_prices[k], stop_losses[k], take_profits[k], entry_times[k],
+                                  exit_idx[k], exit_price[k], exit_reason[k], df)
     
-    print(f"  Trade {len(backtest.trades)}: {trade['exit_reason']} | P&L: ${trade['pnl_dollars']:.2f}")
+    print(f"  Trade {backtest.n_trades}: {trade['exit_reason']} | P&L: ${trade['pnl_dollars']:.2f}")
 
 backtest.print_summary()
 
-if backtest.trades:
-    pd.DataFrame(backtest.trades).to_csv('logs/backtest_trades.csv', index=False)
+if backtest.n_trades:
+    backtest.to_frame().to_csv('logs/backtest_trades.csv', index=False)
     print("\n✓ Trade log saved to logs/backtest_trades.csv")
@@ -1,5 +1,55 @@
-import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from _njit import HAVE_NUMBA, njit
+
+
+@njit(cache=True)
+def _swing_extrema(values, window, high):
+    """
+    Positions of the strict local maxima (high=True) or minima of values
+    over window candles each side
+    
+    Returns:
+        Array of indices, in order
+    """
+    n = len(values)
+    out = np.empty(n, dtype=np.int64)
+    k = 0
+    
+    for i in range(window, n - window):
+        current = values[i]
+        
+        is_swing = True
+        for j in range(i - window, i + window + 1):
+            if j != i and (values[j] >= current if high else values[j] <= current):
+                is_swing = False
+                break
+        
+        if is_swing:
+            out[k] = i
+            k += 1
+    
+    return out[:k]
+
+
+def _swing_extrema_vectorized(values, window, high):
+    """_swing_extrema as one comparison over every (2 * window + 1)-candle window"""
+    size = 2 * window + 1
+    if len(values) < size:
+        return np.empty(0, dtype=np.int64)
+    
+    windows = sliding_window_view(values, size)
+    center = windows[:, window:window+1]
+    beaten = windows >= center if high else windows <= center
+    beaten[:, window] = False  # a candle doesn't beat itself
+    
+    return (np.flatnonzero(~beaten.any(axis=1)) + window).astype(np.int64)
+
+
+if not HAVE_NUMBA:
+    # Uncompiled, the kernel is a per-candle Python loop; one windowed comparison is far faster
+    _swing_extrema = _swing_extrema_vectorized
+
 
 class SupportResistanceDetector:
     """Identifies key support and resistance levels"""
@@ -10,8 +60,13 @@ class SupportResistanceDetector:
             df: OHLC DataFrame
             lookback_candles: How far back to scan for levels
         """
-        self.df = df.tail(lookback_candles).copy()
-        self.df.reset_index(drop=True, inplace=True)
+        # Views of the last lookback_candles highs and lows (positions count from
+        # the first of them); the swing scans only read these, so nothing is copied
+        start = max(len(df) - lookback_candles, 0)
+        self._high = df['high'].to_numpy(dtype=np.float64)[start:]
+        self._low = df['low'].to_numpy(dtype=np.float64)[start:]
+        # (levels, level prices, level strengths) per kind, built on the first proximity check
+        self._levels = {}
         
     def find_swing_highs(self, window=5):
         """
@@ -23,37 +78,15 @@ class SupportResistanceDetector:
         Returns:
             List of (index, price) tuples
         """
-        swing_highs = []
-        
-        for i in range(window, len(self.df) - window):
-            current_high = self.df.iloc[i]['high']
-            
-            is_swing_high = True
-            for j in range(i - window, i + window + 1):
-                if j != i and self.df.iloc[j]['high'] >= current_high:
-                    is_swing_high = False
-                    break
-            
-            if is_swing_high:
-                swing_highs.append((i, current_high))
+        indices = _swing_extrema(self._high, window, True)
+        swing_highs = list(zip(indices.tolist(), self._high[indices]))
         
         return swing_highs
     
     def find_swing_lows(self, window=5):
         """Find swing low points (local minima)"""
-        swing_lows = []
-        
-        for i in range(window, len(self.df) - window):
-            current_low = self.df.iloc[i]['low']
-            
-            is_swing_low = True
-            for j in range(i - window, i + window + 1):
-                if j != i and self.df.iloc[j]['low'] <= current_low:
-                    is_swing_low = False
-                    break
-            
-            if is_swing_low:
-                swing_lows.append((i, current_low))
+        indices = _swing_extrema(self._low, window, False)
+        swing_lows = list(zip(indices.tolist(), self._low[indices]))
         
         return swing_lows
     
@@ -75,13 +108,16 @@ class SupportResistanceDetector:
         
         zones = []
         current_zone = [sorted_points[0][1]]
+        # Running total of the zone's prices, so each step's average is O(1)
+        zone_sum = current_zone[0]
         
         for i in range(1, len(sorted_points)):
             price = sorted_points[i][1]
-            zone_avg = np.mean(current_zone)
+            zone_avg = zone_sum / len(current_zone)
             
             if abs(price - zone_avg) / zone_avg <= (tolerance_pct / 100):
                 current_zone.append(price)
+                zone_sum += price
             else:
                 zones.append({
                     'price': np.mean(current_zone),
@@ -89,6 +125,7 @@ class SupportResistanceDetector:
                     'strength': len(current_zone)
                 })
                 current_zone = [price]
+                zone_sum = price
         
         zones.append({
             'price': np.mean(current_zone),
@@ -110,22 +147,66 @@ class SupportResistanceDetector:
         swing_highs = self.find_swing_highs(window=5)
         return self.cluster_levels(swing_highs, tolerance_pct=0.2)
     
-    def is_at_support(self, current_price, tolerance_pct=0.3):
-        """Check if current price is near a support level"""
-        support_levels = self.get_support_levels()
+    def _levels_with_prices(self, kind):
+        """
+        Support or resistance levels plus their prices and strengths as arrays,
+        computed once per detector. Prices come out ascending (cluster_levels
+        walks the swing points in price order).
+        """
+        if kind not in self._levels:
+            levels = self.get_support_levels() if kind == 'support' else self.get_resistance_levels()
+            prices = np.array([level['price'] for level in levels], dtype=np.float64)
+            strengths = np.array([level['strength'] for level in levels], dtype=np.int64)
+            self._levels[kind] = (levels, prices, strengths)
+        return self._levels[kind]
+    
+    @staticmethod
+    def _first_level_within(levels, prices, current_price, tolerance_pct):
+        """First level (lowest price first) within tolerance_pct of current_price"""
+        near = np.abs(current_price - prices) / prices <= (tolerance_pct / 100)
+        if not near.any():
+            return False, None
+        return True, levels[int(near.argmax())]
+    
+    def first_levels_within(self, current_prices, kind, tolerance_pct=0.3):
+        """
+        Batch form of is_at_support / is_at_resistance
         
-        for level in support_levels:
-            if abs(current_price - level['price']) / level['price'] <= (tolerance_pct / 100):
-                return True, level
+        The levels within tolerance of a price form a contiguous run of the
+        sorted level prices starting at or just after price / (1 + tol), so one
+        searchsorted finds each price's first (lowest) candidate.
         
-        return False, None
+        Args:
+            current_prices: Array of prices to check
+            kind: 'support' or 'resistance'
+            tolerance_pct: Same meaning as in is_at_support
+            
+        Returns:
+            (levels, level strengths, index array) - index[k] is the position in
+            levels of the level matched by current_prices[k], or -1 if none
+        """
+        levels, prices, strengths = self._levels_with_prices(kind)
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        matched = np.full(len(current_prices), -1, dtype=np.int64)
+        if len(prices) == 0:
+            return levels, strengths, matched
+        
+        tol = tolerance_pct / 100
+        # Step back one slot so rounding in the division can't skip the first match
+        lo = np.clip(np.searchsorted(prices, current_prices / (1 + tol)) - 1, 0, len(prices) - 1)
+        hi = np.minimum(lo + 1, len(prices) - 1)
+        lo_near = np.abs(current_prices - prices[lo]) / prices[lo] <= tol
+        hi_near = np.abs(current_prices - prices[hi]) / prices[hi] <= tol
+        matched[hi_near] = hi[hi_near]
+        matched[lo_near] = lo[lo_near]
+        return levels, strengths, matched
+    
+    def is_at_support(self, current_price, tolerance_pct=0.3):
+        """Check if current price is near a support level"""
+        levels, prices, _ = self._levels_with_prices('support')
+        return self._first_level_within(levels, prices, current_price, tolerance_pct)
     
     def is_at_resistance(self, current_price, tolerance_pct=0.3):
         """Check if current price is near a resistance level"""
-        resistance_levels = self.get_resistance_levels()
-        
-        for level in resistance_levels:
-            if abs(current_price - level['price']) / level['price'] <= (tolerance_pct / 100):
-                return True, level
-        
-        return False, None
+        levels, prices, _ = self._levels_with_prices('resistance')
+        return self._first_level_within(levels, prices, current_price, tolerance_pct)
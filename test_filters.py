@@ -1,9 +1,15 @@
 from market_data import MarketDataFetcher
+from bar_cache import BarCache
 from pattern_detector import PatternDetector
+import logging
+
+# PatternDetector's status lines go through logging; show them like the prints around them
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 fetcher = MarketDataFetcher()
 fetcher.connect()
-df = fetcher.get_candles(timeframe_minutes=15, num_candles=500)
+# Served from the bar cache under logs/; only candles since the last run are downloaded
+df = BarCache(fetcher).get_candles(timeframe_minutes=15, num_candles=500)
 fetcher.disconnect()
 
 detector = PatternDetector(df)
@@ -1,4 +1,8 @@
 from live_scanner import LiveScanner
+import logging
+
+# Order and indicator status lines go through logging; show them like the prints around them
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 scanner = LiveScanner(timeframe_min=15, scan_interval_sec=60, auto_trade=False)
 scanner.run()
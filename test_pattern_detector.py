@@ -1,25 +1,64 @@
 from market_data import MarketDataFetcher
-from pattern_detector import PatternDetector
+from bar_cache import BarCache
+from pattern_detector import PatternDetector, scan_engulfing_symbols
+from indicator_cache import INDICATOR_COLUMNS
+import numpy as np
+import logging
+
+# PatternDetector's status lines go through logging; show them like the prints around them
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 print("Fetching data...")
 fetcher = MarketDataFetcher()
 fetcher.connect()
-df = fetcher.get_candles(timeframe_minutes=15, num_candles=500)
+# Served from the bar cache under logs/; only candles since the last run are downloaded
+df = BarCache(fetcher).get_candles(timeframe_minutes=15, num_candles=500)
 fetcher.disconnect()
 
 print("\nDetecting bullish engulfing patterns...")
 detector = PatternDetector(df)
-bullish_signals = detector.detect_bullish_engulfing(min_body_ratio=1.5)
+# One pass finds both directions; the bearish ones are reported further down
+bullish_signals, bearish_signals = detector.detect_engulfing_both(min_body_ratio=1.5)
 
 print(f"Found {len(bullish_signals)} bullish engulfing patterns")
 
-for idx in bullish_signals:
-    details = detector.get_pattern_details(idx)
-    print(f"\nPattern at index {idx}:")
-    print(f"  Time: {details['time']}")
-    print(f"  Price: {details['close']:.2f}")
-    print(f"  Body ratio: {details.get('body_ratio', 0):.2f}x")
+details = detector.get_pattern_details_batch(bullish_signals)
+for row in details.itertuples():
+    print(f"\nPattern at index {row.Index}:")
+    print(f"  Time: {row.time}")
+    print(f"  Price: {row.close:.2f}")
+    print(f"  Body ratio: {row.body_ratio:.2f}x")
 
 print("\nDetecting bearish engulfing patterns...")
-bearish_signals = detector.detect_bearish_engulfing(min_body_ratio=1.5)
 print(f"Found {len(bearish_signals)} bearish engulfing patterns")
+
+print("\nChecking append_bar against a full rebuild...")
+# Start from all but the last 50 candles and feed those in one at a time
+incremental = PatternDetector(df.iloc[:-50])
+incremental.detect_engulfing_both(min_body_ratio=1.5)
+for row in df.iloc[-50:].itertuples():
+    incremental.append_bar(row.time, row.open, row.high, row.low, row.close, row.volume)
+
+indicators_match = all(np.allclose(incremental.df[col].to_numpy(dtype=np.float64),
+                                   detector.df[col].to_numpy(dtype=np.float64), equal_nan=True)
+                       for col in INDICATOR_COLUMNS + ('body', 'upper_wick', 'lower_wick'))
+signals_match = incremental.detect_engulfing_both(min_body_ratio=1.5) == (bullish_signals, bearish_signals)
+if indicators_match and signals_match:
+    print("✓ append_bar matches a full rebuild")
+else:
+    print(f"✗ append_bar differs from a full rebuild (indicators: {indicators_match}, signals: {signals_match})")
+
+print("\nChecking scan_engulfing_symbols against per-symbol detectors...")
+# Four equal slices of the history stand in for four symbols' aligned bars
+slices = [df.iloc[k:k + len(df) // 4] for k in range(0, len(df) // 4 * 4, len(df) // 4)]
+opens = np.stack([part['open'].to_numpy() for part in slices])
+closes = np.stack([part['close'].to_numpy() for part in slices])
+bullish_rows = scan_engulfing_symbols(opens, closes, min_body_ratio=1.5, bullish=True)
+bearish_rows = scan_engulfing_symbols(opens, closes, min_body_ratio=1.5, bullish=False)
+scans_match = all(PatternDetector(part).detect_engulfing_both(min_body_ratio=1.5) ==
+                  (np.flatnonzero(bullish_rows[s]).tolist(), np.flatnonzero(bearish_rows[s]).tolist())
+                  for s, part in enumerate(slices))
+if scans_match:
+    print("✓ scan_engulfing_symbols matches the per-symbol detectors")
+else:
+    print("✗ scan_engulfing_symbols differs from the per-symbol detectors")
@@ -1,9 +1,15 @@
 from market_data import MarketDataFetcher
+from bar_cache import BarCache
 from pattern_detector import PatternDetector
+import logging
+
+# PatternDetector's status lines go through logging; show them like the prints around them
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 fetcher = MarketDataFetcher()
 fetcher.connect()
-df = fetcher.get_candles(timeframe_minutes=15, num_candles=500)
+# Served from the bar cache under logs/; only candles since the last run are downloaded
+df = BarCache(fetcher).get_candles(timeframe_minutes=15, num_candles=500)
 fetcher.disconnect()
 
 detector = PatternDetector(df)
@@ -21,6 +27,8 @@ else:
     print(f"  After filters: {len(filtered)}")
     print(f"  After S/R check: {len(sr_confirmed)}")
 
-print(f"\nHigh-quality signals (with S/R):")
-for signal in sr_confirmed:
-    print(f"  Index {signal['index']}: Price {signal['price']:.2f} at support {signal['support_level']:.2f} (strength {signal['support_strength']})")
+# Build the listing and write it with a single print
+lines = [f"\nHigh-quality signals (with S/R):"]
+lines += [f"  Index {signal['index']}: Price {signal['price']:.2f} at support {signal['support_level']:.2f} (strength {signal['support_strength']})"
+          for signal in sr_confirmed]
+print('\n'.join(lines))
@@ -1,9 +1,12 @@
+import pandas as pd
 from market_data import MarketDataFetcher
+from bar_cache import BarCache
 from support_resistance import SupportResistanceDetector
 
 fetcher = MarketDataFetcher()
 fetcher.connect()
-df = fetcher.get_candles(timeframe_minutes=15, num_candles=200)
+# Served from the bar cache under logs/; only candles since the last run are downloaded
+df = BarCache(fetcher).get_candles(timeframe_minutes=15, num_candles=200)
 fetcher.disconnect()
 
 sr_detector = SupportResistanceDetector(df, lookback_candles=150)
@@ -11,15 +14,22 @@ sr_detector = SupportResistanceDetector(df, lookback_candles=150)
 support_levels = sr_detector.get_support_levels()
 resistance_levels = sr_detector.get_resistance_levels()
 
+def level_lines(levels):
+    """One "Price | Touches | Strength" line per level, built column-wise"""
+    levels_df = pd.DataFrame(levels, columns=['price', 'touches', 'strength'])
+    return ('  Price: ' + levels_df['price'].map('{:.2f}'.format) +
+            ' | Touches: ' + levels_df['touches'].astype(str) +
+            ' | Strength: ' + levels_df['strength'].astype(str))
+
 print(f"Found {len(support_levels)} support levels:")
-for level in support_levels:
-    print(f"  Price: {level['price']:.2f} | Touches: {level['touches']} | Strength: {level['strength']}")
+if support_levels:
+    print('\n'.join(level_lines(support_levels)))
 
 print(f"\nFound {len(resistance_levels)} resistance levels:")
-for level in resistance_levels:
-    print(f"  Price: {level['price']:.2f} | Touches: {level['touches']} | Strength: {level['strength']}")
+if resistance_levels:
+    print('\n'.join(level_lines(resistance_levels)))
 
-current_price = df.iloc[-1]['close']
+current_price = df['close'].iat[-1]
 print(f"\nCurrent price: {current_price:.2f}")
 
 at_support, support_info = sr_detector.is_at_support(current_price)
@@ -1,15 +1,20 @@
 from market_data import MarketDataFetcher
+from bar_cache import BarCache
 from pattern_detector import PatternDetector
 from visualizer import ChartVisualizer
+import logging
+
+# PatternDetector's status lines go through logging; show them like the prints around them
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 fetcher = MarketDataFetcher()
 fetcher.connect()
-df = fetcher.get_candles(timeframe_minutes=15, num_candles=300)
+# Served from the bar cache under logs/; only candles since the last run are downloaded
+df = BarCache(fetcher).get_candles(timeframe_minutes=15, num_candles=300)
 fetcher.disconnect()
 
 detector = PatternDetector(df)
-bullish = detector.detect_bullish_engulfing()
-bearish = detector.detect_bearish_engulfing()
+bullish, bearish = detector.detect_engulfing_both()
 
 viz = ChartVisualizer()
 viz.plot_with_signals(df, bullish, bearish, title="Gold - Engulfing Patterns")
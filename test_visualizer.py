@@ -1,9 +1,11 @@
 from market_data import MarketDataFetcher
+from bar_cache import BarCache
 from visualizer import ChartVisualizer
 
 fetcher = MarketDataFetcher()
 fetcher.connect()
-df = fetcher.get_candles(timeframe_minutes=15, num_candles=100)
+# Served from the bar cache under logs/; only candles since the last run are downloaded
+df = BarCache(fetcher).get_candles(timeframe_minutes=15, num_candles=100)
 fetcher.disconnect()
 
 viz = ChartVisualizer()
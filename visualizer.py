@@ -1,10 +1,170 @@
-import mplfinance as mpf
+import hashlib
+import io
+import os
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 
+
+# Saved charts are small log images: 8x4 inches at 72 dpi (576x288 px)
+FIGSIZE = (8, 4)
+SAVE_DPI = 72
+
+# Rendered charts by content hash, so re-plotting unchanged inputs is just a copy.
+# Every new bar changes the hash, so only the most recently used ones are kept.
+CHART_CACHE_DIR = 'logs/.cache'
+CHART_CACHE_MAX = 32
+
+
+@lru_cache(maxsize=None)
+def _mpf():
+    """
+    mplfinance and the chart style both plot methods share, imported and
+    built on the first plot so that importing this module stays cheap
+    
+    Returns:
+        (mplfinance module, mpf style)
+    """
+    import mplfinance as mpf
+    
+    mc = mpf.make_marketcolors(
+        up='green', down='red',
+        edge='inherit',
+        wick='inherit',
+        volume='in'
+    )
+    
+    style = mpf.make_mpf_style(
+        marketcolors=mc,
+        gridstyle='-',
+        y_on_right=False
+    )
+    
+    return mpf, style
+
+
+def _agg_chart(style):
+    """
+    Off-screen figure and axes for a chart that is only saved
+    
+    The figure gets its own Agg canvas instead of coming from pyplot, so
+    saving never sets up the GUI backend or changes the process-wide one;
+    displayed charts (plot_candles without save_path) are unaffected.
+    
+    Returns:
+        (figure, axes)
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from mplfinance._mplwraps import Mpf_Figure  # what mpf.figure() builds, minus pyplot
+    
+    fig = Mpf_Figure(figsize=FIGSIZE)
+    fig.mpfstyle = style
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _png_bytes(fig):
+    """Render fig to PNG in memory"""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=SAVE_DPI)
+    return buf
+
+
+def _write_png(path, data):
+    """Write a rendered chart's bytes to path in one write, swapped in atomically"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _chart_cache_path(kind, df, title, *signals):
+    """
+    Cache file for a chart, keyed on everything that goes into drawing it: the
+    chart kind, candle times and OHLC, title, signal indices and image size.
+    The style lives in code and isn't hashed; clear CHART_CACHE_DIR after
+    changing it.
+    """
+    key = hashlib.blake2b(digest_size=8)
+    key.update(repr((kind, title, FIGSIZE, SAVE_DPI)).encode())
+    key.update(pd.DatetimeIndex(df['time']).asi8.tobytes())
+    key.update(np.ascontiguousarray(df[['open', 'high', 'low', 'close']].to_numpy(dtype=np.float64)).tobytes())
+    for indices in signals:
+        key.update(b'|' + indices.tobytes())
+    return os.path.join(CHART_CACHE_DIR, f'{key.hexdigest()}.png')
+
+
+def _restore_cached(cache_path, save_path):
+    """Write a cached chart to save_path, swapped in atomically like a fresh one"""
+    with open(cache_path, 'rb') as f:
+        _write_png(save_path, f.read())
+    try:
+        os.utime(cache_path)  # recently used, so pruned last
+    except OSError:
+        pass
+
+
+def _save_chart(save_path, cache_path, buf):
+    """Write a freshly rendered chart to save_path and keep a copy in the cache"""
+    _write_png(save_path, buf.getbuffer())
+    try:
+        os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+        _write_png(cache_path, buf.getbuffer())
+        _prune_chart_cache()
+    except OSError as e:
+        print(f"⚠️  Could not cache chart: {e}")
+
+
+def _prune_chart_cache():
+    """Delete the least recently used cached charts beyond CHART_CACHE_MAX"""
+    entries = [entry for entry in os.scandir(CHART_CACHE_DIR) if entry.name.endswith('.png')]
+    if len(entries) <= CHART_CACHE_MAX:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - CHART_CACHE_MAX]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass  # already removed by another process
+
+
+def _downsample_ohlc(df, target_bars=500):
+    """
+    Merge every k consecutive candles into one (first open, max high, min low,
+    last close) so that about target_bars remain; past that several candles
+    share a pixel column of the chart anyway
+    
+    Returns:
+        (DataFrame with time, open, high, low, close; k) - df itself when k is 1
+    """
+    k = max(1, len(df) // target_bars)
+    if k == 1:
+        return df, 1
+    
+    starts = np.arange(0, len(df), k)
+    ends = np.minimum(starts + k, len(df)) - 1
+    merged = pd.DataFrame({
+        'time': df['time'].array[starts],
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+    })
+    return merged, k
+
+
+def _ohlc_frame(df):
+    """df's OHLC columns indexed by time, as mplfinance wants them (no data copy)"""
+    return pd.DataFrame({col: df[col].array for col in ('open', 'high', 'low', 'close')},
+                        index=pd.DatetimeIndex(df['time']), copy=False)
+
+
 class ChartVisualizer:
     """Create candlestick charts"""
     
+    # Only static methods; instances (viz = ChartVisualizer()) carry no state
+    __slots__ = ()
+    
     @staticmethod
     def plot_candles(df, title="Gold Chart", save_path=None):
         """
@@ -15,74 +175,87 @@ class ChartVisualizer:
             title: Chart title
             save_path: If provided, saves chart to this path
         """
-        df_plot = df.copy()
-        df_plot.set_index('time', inplace=True)
+        if save_path:
+            cache_path = _chart_cache_path('candles', df, title)
+            if os.path.exists(cache_path):
+                _restore_cached(cache_path, save_path)
+                print(f"✓ Chart saved to {save_path}")
+                return
         
-        mc = mpf.make_marketcolors(
-            up='green', down='red',
-            edge='inherit',
-            wick='inherit',
-            volume='in'
-        )
+        mpf, style = _mpf()
+        df, _ = _downsample_ohlc(df)
+        df_plot = _ohlc_frame(df)
         
-        s = mpf.make_mpf_style(
-            marketcolors=mc,
-            gridstyle='-',
-            y_on_right=False
-        )
+        if not save_path:
+            mpf.plot(
+                df_plot,
+                type='candle',
+                style=style,
+                title=title,
+                ylabel='Price (USD)',
+                volume=False,
+                figsize=FIGSIZE
+            )
+            print("✓ Chart displayed")
+            return
         
+        # Rendered off-screen into memory, then written out whole
+        fig, ax = _agg_chart(style)
         mpf.plot(
             df_plot,
+            ax=ax,
             type='candle',
-            style=s,
-            title=title,
+            style=style,
+            axtitle=title,
             ylabel='Price (USD)',
-            volume=False,
-            savefig=save_path if save_path else None
+            volume=False
         )
-        
-        if save_path:
-            print(f"✓ Chart saved to {save_path}")
-        else:
-            print("✓ Chart displayed")
+        _save_chart(save_path, cache_path, _png_bytes(fig))
+        print(f"✓ Chart saved to {save_path}")
     
     @staticmethod
-    def plot_with_signals(df, bullish_signals=[], bearish_signals=[], title="Gold Chart with Patterns"):
+    def plot_with_signals(df, bullish_signals=None, bearish_signals=None, title="Gold Chart with Patterns"):
         """Plot chart with pattern markers"""
-        df_plot = df.copy()
-        df_plot.set_index('time', inplace=True)
+        save_path = 'logs/patterns_marked.png'
+        # Signal candle indices (lists or arrays)
+        bullish_signals = np.asarray(bullish_signals if bullish_signals is not None else [], dtype=np.intp)
+        bearish_signals = np.asarray(bearish_signals if bearish_signals is not None else [], dtype=np.intp)
         
-        if bullish_signals:
-            df_plot.loc[df.iloc[bullish_signals]['time'].values, 'Buy'] = [df.iloc[idx]['low'] * 0.999 for idx in bullish_signals]
-        if bearish_signals:
-            df_plot.loc[df.iloc[bearish_signals]['time'].values, 'Sell'] = [df.iloc[idx]['high'] * 1.001 for idx in bearish_signals]
+        cache_path = _chart_cache_path('signals', df, title, bullish_signals, bearish_signals)
+        if os.path.exists(cache_path):
+            _restore_cached(cache_path, save_path)
+            print(f"✓ Chart with patterns saved to {save_path}")
+            return
         
-        apds = []
-        if 'Buy' in df_plot.columns:
-            apds.append(mpf.make_addplot(df_plot['Buy'], type='scatter', markersize=100, marker='^', color='green'))
-        if 'Sell' in df_plot.columns:
-            apds.append(mpf.make_addplot(df_plot['Sell'], type='scatter', markersize=100, marker='v', color='red'))
+        mpf, style = _mpf()
+        df, k = _downsample_ohlc(df)
+        df_plot = _ohlc_frame(df)
+        # Mapped onto the plotted candles
+        bullish_signals = bullish_signals // k
+        bearish_signals = bearish_signals // k
+        fig, ax = _agg_chart(style)
         
-        mc = mpf.make_marketcolors(
-            up='green', down='red',
-            edge='inherit',
-            wick='inherit',
-            volume='in'
-        )
-        
-        s = mpf.make_mpf_style(
-            marketcolors=mc,
-            gridstyle='-',
-            y_on_right=False
-        )
+        # Marker prices just below/above the signal candles (or the merged candles
+        # holding them), NaN (no marker) elsewhere
+        apds = []
+        if bullish_signals.size:
+            buy = np.full(len(df_plot), np.nan)
+            buy[bullish_signals] = df['low'].to_numpy()[bullish_signals] * 0.999
+            apds.append(mpf.make_addplot(buy, ax=ax, type='scatter', markersize=100, marker='^', color='green'))
+        if bearish_signals.size:
+            sell = np.full(len(df_plot), np.nan)
+            sell[bearish_signals] = df['high'].to_numpy()[bearish_signals] * 1.001
+            apds.append(mpf.make_addplot(sell, ax=ax, type='scatter', markersize=100, marker='v', color='red'))
         
+        # mplfinance rejects addplot=None, so it is only passed with markers
         mpf.plot(
-            df_plot[['open', 'high', 'low', 'close']], 
+            df_plot,
+            ax=ax,
             type='candle',
-            style=s,
-            title=title,
-            addplot=apds if apds else None,
-            savefig='logs/patterns_marked.png'
+            style=style,
+            axtitle=title,
+            **({'addplot': apds} if apds else {})
         )
+        _save_chart(save_path, cache_path, _png_bytes(fig))
         
-        print(f"✓ Chart with patterns saved to logs/patterns_marked.png")
+        print(f"✓ Chart with patterns saved to {save_path}")